@@ -1,15 +1,93 @@
 import asyncio
 import logging
+from typing import Any
 
 from homeassistant import config_entries, core
+import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN
+from .const import (
+    CONF_CONSUMPTION_COST,
+    CONF_IMPORT_STATISTICS,
+    CONF_METERING_POINT,
+    CONF_MQTT_TOPIC,
+    CONF_PRICE_SENSOR,
+    DATA_COORDINATOR,
+    DATA_COORDINATORS,
+    DATA_COST_COORDINATOR,
+    DATA_PRICE_STREAM,
+    DATA_STATISTICS_IMPORTERS,
+    DEFAULT_CONSUMPTION_COST,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_MQTT_TOPIC,
+    DOMAIN,
+)
+from .consumption_cost import ConsumptionCostCoordinator
+from .coordinator import ElectricityPriceCoordinator
+from .price_stream import PriceStream
+from .services import async_setup_services
+from .websocket_api import async_setup_websocket_api
 
-PLATFORMS: list[str] = ["sensor"]
+PLATFORMS: list[str] = ["sensor", "binary_sensor"]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@core.callback
+def async_acquire_coordinator(
+        hass: core.HomeAssistant, config: dict[str, Any], subscriber: str
+) -> ElectricityPriceCoordinator:
+    """Return the coordinator shared by all entries for the same (metering point, price sensor) pair.
+
+    The first subscriber creates it; later subscribers reuse it, including its
+    tariffs and calculated prices. Its prices are imported into long-term
+    statistics once, if any subscriber has the import enabled.
+    """
+    coordinators = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_COORDINATORS, {})
+    key = (config[CONF_METERING_POINT], config[CONF_PRICE_SENSOR])
+    if key not in coordinators:
+        coordinators[key] = ElectricityPriceCoordinator(hass, config)
+    coordinator = coordinators[key]
+    coordinator.subscribers.add(subscriber)
+
+    importers = hass.data[DOMAIN].setdefault(DATA_STATISTICS_IMPORTERS, {})
+    if (
+            key not in importers
+            and config.get(CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS)
+            and "recorder" in hass.config.components
+    ):
+        # Imported here, so the recorder is only loaded when it is used.
+        from .long_term_statistics import PriceStatisticsImporter
+
+        importer = PriceStatisticsImporter(hass, coordinator)
+        importers[key] = coordinator.async_add_listener(importer.async_schedule_import)
+    return coordinator
+
+
+async def async_release_coordinator(
+        hass: core.HomeAssistant, config: dict[str, Any], subscriber: str
+) -> None:
+    """Unsubscribe from a shared coordinator, shutting it down when no subscribers are left."""
+    coordinators = hass.data[DOMAIN][DATA_COORDINATORS]
+    key = (config[CONF_METERING_POINT], config[CONF_PRICE_SENSOR])
+    coordinator = coordinators[key]
+    coordinator.subscribers.discard(subscriber)
+    if not coordinator.subscribers:
+        coordinators.pop(key)
+        if unsub_importer := hass.data[DOMAIN].get(DATA_STATISTICS_IMPORTERS, {}).pop(key, None):
+            unsub_importer()
+        coordinator.async_shutdown_listeners()
+        await coordinator.async_shutdown()
+
+
+async def async_setup(hass: core.HomeAssistant, config: dict[str, Any]) -> bool:
+    """Set up the services, shared by all config entries and YAML sensors, and the websocket API."""
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    return True
+
+
 async def async_setup_entry(
         hass: core.HomeAssistant,
         entry: config_entries.ConfigEntry
@@ -17,6 +95,29 @@ async def async_setup_entry(
     """Set up platform from a ConfigEntry."""
     hass.data.setdefault(DOMAIN, {})
     hass_data = dict(entry.data)
+    # Options (e.g. the tariff TTL) take precedence over the initial config.
+    hass_data.update(entry.options)
+
+    coordinator = async_acquire_coordinator(hass, hass_data, entry.entry_id)
+    if coordinator.data is None:
+        # Don't hold up startup waiting for the price sensor; entities update once prices are in.
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
+    hass_data[DATA_COORDINATOR] = coordinator
+
+    if hass_data.get(CONF_CONSUMPTION_COST, DEFAULT_CONSUMPTION_COST):
+        cost_coordinator = ConsumptionCostCoordinator(hass, coordinator, entry)
+        entry.async_create_background_task(
+            hass, cost_coordinator.async_refresh(), f"{DOMAIN} first cost refresh {entry.entry_id}"
+        )
+        hass_data[DATA_COST_COORDINATOR] = cost_coordinator
+
+    # Push price changes and the current interval to websocket subscribers and MQTT.
+    price_stream = PriceStream(hass, coordinator, hass_data.get(CONF_MQTT_TOPIC, DEFAULT_MQTT_TOPIC))
+    entry.async_on_unload(price_stream.async_start())
+    hass_data[DATA_PRICE_STREAM] = price_stream
+
     # Registers update listener to update config entry when options are updated.
     unsub_options_update_listener = entry.add_update_listener(options_update_listener)
     # Store a reference to the unsubscribe function to clean up if an entry is unloaded.
@@ -45,6 +146,7 @@ async def async_unload_entry(
 
     # Remove config entry from domain.
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        hass_data = hass.data[DOMAIN].pop(entry.entry_id)
+        await async_release_coordinator(hass, hass_data, entry.entry_id)
 
     return unload_ok
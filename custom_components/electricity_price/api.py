@@ -0,0 +1,230 @@
+"""
+Async client for the Eloverblik customer API
+https://api.eloverblik.dk/customerapi/index.html
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from datetime import date, datetime, timedelta
+from typing import Any, NamedTuple
+
+import aiohttp
+
+from homeassistant import core
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, DATA_CLIENTS
+
+_LOGGER = logging.getLogger(__name__)
+
+API_URL = "https://api.eloverblik.dk/CustomerApi/api"
+# Data access tokens are valid for 24 hours; renew them a bit before.
+TOKEN_LIFETIME = timedelta(hours=23)
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0  # seconds
+BACKOFF_MAX = 60.0  # seconds
+# Busy and rate limited responses, retried after the Retry-After header if given.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Resolutions of meter data time series, in seconds.
+RESOLUTIONS = {"PT15M": 15 * 60, "PT1H": 60 * 60}
+
+
+class EloverblikError(Exception):
+    """Raised when a request to Eloverblik fails."""
+
+
+class EloverblikAuthError(EloverblikError):
+    """Raised when Eloverblik rejects the refresh token."""
+
+
+def parse_charges(result: dict[str, Any]) -> dict[str, Any]:
+    """Return the tariffs of a metering point by name, as a price or a list of hourly prices.
+
+    Names are lower case with underscores, e.g. "Transmissions nettarif" becomes
+    "transmissions_nettarif". Hourly network tariffs ("Nettarif C time") are
+    returned as "nettarif_c".
+    """
+    charges: dict[str, Any] = {}
+    for tariff in result.get("tariffs", []):
+        name = tariff["name"].strip().lower().replace(" ", "_")
+        if name.startswith("nettarif_c"):
+            name = "nettarif_c"
+        prices = sorted(tariff.get("prices", []), key=lambda price: int(price["position"]))
+        if len(prices) == 1:
+            charges[name] = prices[0]["price"]
+        else:
+            charges[name] = [price["price"] for price in prices]
+    return charges
+
+
+class MeterPeriod(NamedTuple):
+    """Consumption of a metering point in kWh per interval, from the start of a period."""
+
+    start: datetime
+    resolution: int  # seconds
+    quantities: list[float]
+
+
+def parse_time_series(result: dict[str, Any]) -> list[MeterPeriod]:
+    """Return the periods of the meter data of a metering point, one per local day.
+
+    Intervals without a point have no consumption. Periods in resolutions other
+    than 15 minutes or an hour are left out.
+    """
+    periods = []
+    document = result.get("MyEnergyData_MarketDocument") or {}
+    for series in document.get("TimeSeries", []):
+        for period in series.get("Period", []):
+            resolution = RESOLUTIONS.get(period.get("resolution"))
+            start = dt_util.parse_datetime(period["timeInterval"]["start"])
+            end = dt_util.parse_datetime(period["timeInterval"]["end"])
+            if resolution is None or start is None or end is None:
+                _LOGGER.debug("Skipping meter data period in %s", period.get("resolution"))
+                continue
+            quantities = [0.0] * (int((end - start).total_seconds()) // resolution)
+            for point in period.get("Point", []):
+                position = int(point["position"]) - 1
+                if 0 <= position < len(quantities):
+                    quantities[position] = float(point["out_Quantity.quantity"])
+            periods.append(MeterPeriod(start, resolution, quantities))
+    return periods
+
+
+class EloverblikClient:
+    """Eloverblik client on Home Assistant's shared aiohttp session.
+
+    The short-lived data access token is reused until it expires, and requests
+    are retried with jittered exponential backoff, respecting Retry-After when
+    Eloverblik is busy or rate limits.
+    """
+
+    def __init__(
+            self,
+            session: aiohttp.ClientSession,
+            refresh_token: str,
+            api_url: str = API_URL,
+            max_retries: int = MAX_RETRIES,
+            backoff_base: float = BACKOFF_BASE,
+    ):
+        self._session = session
+        self._refresh_token = refresh_token
+        self._api_url = api_url
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._token: str | None = None
+        self._token_expires: datetime | None = None
+        self._token_lock = asyncio.Lock()
+
+    async def _async_get_token(self) -> str:
+        """Return the data access token, exchanging the refresh token only when needed."""
+        async with self._token_lock:
+            if self._token is None or dt_util.utcnow() >= self._token_expires:
+                data = await self._async_request("GET", "token", token=self._refresh_token)
+                self._token = data["result"]
+                self._token_expires = dt_util.utcnow() + TOKEN_LIFETIME
+            return self._token
+
+    def _backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        """Return the delay before the next attempt."""
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), BACKOFF_MAX)
+            except ValueError:
+                pass
+        delay = self._backoff_base * 2 ** attempt
+        return min(delay + random.uniform(0, delay), BACKOFF_MAX)
+
+    async def _async_request(
+            self, method: str, path: str, token: str | None = None, json: Any = None
+    ) -> Any:
+        """Make a request, retrying on busy responses and connection errors."""
+        url = f"{self._api_url}/{path}"
+        for attempt in range(self._max_retries + 1):
+            headers = {"Authorization": f"Bearer {token or await self._async_get_token()}"}
+            retry_after = None
+            try:
+                async with self._session.request(
+                        method, url, headers=headers, json=json, timeout=REQUEST_TIMEOUT
+                ) as response:
+                    if response.status == 401:
+                        if token is not None:
+                            raise EloverblikAuthError("The Eloverblik token was rejected")
+                        # The data access token expired early; get a new one and retry.
+                        self._token = None
+                        error: Exception = EloverblikError("Data access token rejected")
+                    elif response.status in RETRY_STATUSES:
+                        retry_after = response.headers.get("Retry-After")
+                        error = EloverblikError(f"Eloverblik responded {response.status}")
+                    elif response.status >= 400:
+                        raise EloverblikError(f"Eloverblik responded {response.status} for {path}")
+                    else:
+                        return await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+
+            if attempt < self._max_retries:
+                delay = self._backoff(attempt, retry_after)
+                _LOGGER.debug("Request to %s failed (%s), retrying in %.1f s", path, error, delay)
+                await asyncio.sleep(delay)
+
+        raise EloverblikError(f"Request to {path} failed after {self._max_retries + 1} attempts: {error}")
+
+    async def async_get_tariffs(self, metering_point: str) -> dict[str, Any]:
+        """Return the tariffs of a metering point, see parse_charges."""
+        tariffs = await self.async_get_tariffs_batch([metering_point])
+        if metering_point not in tariffs:
+            raise EloverblikError(f"No tariffs for {metering_point}")
+        return tariffs[metering_point]
+
+    async def async_get_tariffs_batch(self, metering_points: list[str]) -> dict[str, dict[str, Any]]:
+        """Return the tariffs of several metering points in one request, by metering point.
+
+        Metering points Eloverblik returns an error for are left out.
+        """
+        data = await self._async_request(
+            "POST",
+            "meteringpoints/meteringpoint/getcharges",
+            json={"meteringPoints": {"meteringPoint": metering_points}},
+        )
+        tariffs = {}
+        for item in data.get("result", []):
+            result = item.get("result") or {}
+            metering_point = result.get("meteringPointId")
+            if not item.get("success", True) or metering_point is None:
+                _LOGGER.debug("No tariffs for %s: %s", metering_point, item.get("errorText"))
+                continue
+            tariffs[metering_point] = parse_charges(result)
+        return tariffs
+
+    async def async_get_time_series(
+            self, metering_point: str, first_day: date, end_day: date
+    ) -> list[MeterPeriod]:
+        """Return the consumption of a metering point from ``first_day`` up to ``end_day`` in its own resolution.
+
+        Eloverblik has the consumption of a day one to a few days later, so recent
+        days may be missing.
+        """
+        data = await self._async_request(
+            "POST",
+            f"meterdata/gettimeseries/{first_day.isoformat()}/{end_day.isoformat()}/Actual",
+            json={"meteringPoints": {"meteringPoint": [metering_point]}},
+        )
+        periods = []
+        for item in data.get("result", []):
+            if not item.get("success", True):
+                raise EloverblikError(f"No meter data for {metering_point}: {item.get('errorText')}")
+            periods.extend(parse_time_series(item))
+        return periods
+
+
+@core.callback
+def get_client(hass: core.HomeAssistant, refresh_token: str) -> EloverblikClient:
+    """Return the client for a refresh token, shared by all entries using it."""
+    clients = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_CLIENTS, {})
+    if refresh_token not in clients:
+        clients[refresh_token] = EloverblikClient(async_get_clientsession(hass), refresh_token)
+    return clients[refresh_token]
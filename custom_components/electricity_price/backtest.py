@@ -0,0 +1,140 @@
+"""
+Repricing of recorded spot prices under any tariffs, one day at a time
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+import logging
+from typing import Any, Iterable, Iterator, NamedTuple
+
+from homeassistant import core
+from homeassistant.util import dt as dt_util
+
+from .const import ATTR_AVERAGE, ATTR_MAX, ATTR_MIN
+from .coordinator import price_day
+from .price_formula import CompiledFormula, PriceFormula
+from .pricing import BULK_BACKEND
+from .spot_prices import SpotSeries
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TariffVersion(NamedTuple):
+    """Tariffs in the format of the Eloverblik charges, in effect from a date on."""
+
+    valid_from: date
+    charges: dict[str, Any]
+
+
+def recorded_spot_days(
+        hass: core.HomeAssistant, entity_id: str, first_day: date, end_day: date
+) -> Iterator[tuple[date, list[float]]]:
+    """Yield the spot prices of each day before ``end_day`` from the last recorded price sensor state of that day.
+
+    Reads one state per day, so memory does not grow with the number of days or
+    recorded states. Must run in the recorder executor.
+    """
+    # Imported here, so the recorder is only loaded when the history is read.
+    from homeassistant.components.recorder.history import state_changes_during_period
+
+    day = first_day
+    while day < end_day:
+        states = state_changes_during_period(
+            hass,
+            dt_util.start_of_local_day(day),
+            dt_util.start_of_local_day(day + timedelta(days=1)),
+            entity_id,
+            no_attributes=False,
+            descending=True,
+            limit=1,
+        ).get(entity_id)
+        if states and (prices := SpotSeries.from_attributes(states[0].attributes).today):
+            yield day, list(prices)
+        day += timedelta(days=1)
+
+
+def priced_days(
+        days: Iterable[tuple[date, list[float]]],
+        versions: Iterable[TariffVersion],
+        time_zone: str,
+        formula: PriceFormula = PriceFormula(),
+) -> Iterator[tuple[date, list[float]]]:
+    """Yield the total prices of each day, priced with the tariffs in effect on that day.
+
+    Prices each day with the same price_day as the coordinator, compiling the
+    price formula once per tariff version, with NumPy if it is installed. Days
+    before the first version are skipped.
+    """
+    versions = sorted(versions, key=lambda version: version.valid_from)
+    valid_from = [version.valid_from for version in versions]
+    compiled: dict[int, CompiledFormula] = {}
+    for day, raw in days:
+        i = bisect_right(valid_from, day) - 1
+        if i < 0:
+            _LOGGER.debug("No tariffs in effect on %s", day)
+            continue
+        if i not in compiled:
+            compiled[i] = formula.compile(versions[i].charges)
+        yield day, price_day(day, raw, compiled[i], time_zone, BULK_BACKEND)
+
+
+@dataclass
+class PriceAggregate:
+    """Running time weighted average, min and max of prices."""
+
+    days: int = 0
+    hours: float = 0.0
+    weighted_sum: float = 0.0
+    min: float = float("inf")
+    max: float = float("-inf")
+
+    def add(self, prices: list[float]) -> None:
+        """Add the prices of a day of hourly or 15-minute intervals."""
+        slot_hours = 1.0 if len(prices) in (23, 24, 25) else 0.25
+        self.days += 1
+        self.hours += len(prices) * slot_hours
+        self.weighted_sum += sum(prices) * slot_hours
+        self.min = min(self.min, *prices)
+        self.max = max(self.max, *prices)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "days": self.days,
+            ATTR_AVERAGE: round(self.weighted_sum / self.hours, 3) if self.hours else None,
+            ATTR_MIN: self.min if self.days else None,
+            ATTR_MAX: self.max if self.days else None,
+        }
+
+
+def aggregate(days: Iterable[tuple[date, list[float]]]) -> dict[str, Any]:
+    """Return the aggregates of priced days overall and per month, consuming them one at a time."""
+    total = PriceAggregate()
+    months: dict[str, PriceAggregate] = {}
+    for day, prices in days:
+        if not prices:
+            continue
+        total.add(prices)
+        months.setdefault(f"{day:%Y-%m}", PriceAggregate()).add(prices)
+    return {
+        **total.as_dict(),
+        "months": {month: result.as_dict() for month, result in months.items()},
+    }
+
+
+def run_backtest(
+        hass: core.HomeAssistant,
+        entity_id: str,
+        first_day: date,
+        end_day: date,
+        versions: Iterable[TariffVersion],
+        formula: PriceFormula = PriceFormula(),
+) -> dict[str, Any]:
+    """Reprice the recorded spot prices from ``first_day`` up to ``end_day`` and aggregate them.
+
+    The stages are generators, so only one day is held in memory at a time.
+    Must run in the recorder executor.
+    """
+    days = recorded_spot_days(hass, entity_id, first_day, end_day)
+    return aggregate(priced_days(days, versions, hass.config.time_zone, formula))
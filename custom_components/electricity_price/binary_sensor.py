@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+from datetime import datetime
+from typing import Callable
+
+from homeassistant import config_entries, core
+from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorEntityDescription
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    NAME,
+    ENTITY_ID,
+    LEGACY_UNIQUE_ID,
+    DATA_COORDINATOR,
+)
+from .coordinator import ElectricityPriceCoordinator, interval_statistics
+from .price_statistics import DayStatistics
+from .sensor import INTERVAL_MINUTES
+
+_LOGGER = logging.getLogger(__name__)
+
+# Share of the intervals of a day counted as cheap, and as expensive.
+CHEAP_FRACTION = 0.25
+EXPENSIVE_FRACTION = 0.25
+
+
+@dataclass(frozen=True, kw_only=True)
+class PriceLevelEntityDescription(BinarySensorEntityDescription):
+    """Describes a binary sensor for the price level of the current interval within its day."""
+
+    is_on_fn: Callable[[DayStatistics, int], bool]
+
+
+PRICE_LEVEL_SENSORS: tuple[PriceLevelEntityDescription, ...] = (
+    PriceLevelEntityDescription(
+        key="cheap",
+        name="Cheapest quarter of the day",
+        icon="mdi:cash-check",
+        is_on_fn=lambda statistics, i: statistics.fraction(i) < CHEAP_FRACTION,
+    ),
+    PriceLevelEntityDescription(
+        key="expensive",
+        name="Most expensive quarter of the day",
+        icon="mdi:cash-remove",
+        is_on_fn=lambda statistics, i: statistics.fraction(i) >= 1 - EXPENSIVE_FRACTION,
+    ),
+)
+
+
+async def async_setup_entry(
+        hass: core.HomeAssistant,
+        config_entry: config_entries.ConfigEntry,
+        async_add_entities
+) -> None:
+    """Setup binary sensors from a config entry created in the integrations UI."""
+    config = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = config[DATA_COORDINATOR]
+    if config_entry.unique_id in (None, LEGACY_UNIQUE_ID):
+        unique_id = ENTITY_ID
+    else:
+        unique_id = f"{ENTITY_ID}_{config_entry.unique_id}"
+    async_add_entities(
+        PriceLevelSensor(coordinator, unique_id, description) for description in PRICE_LEVEL_SENSORS
+    )
+
+
+class PriceLevelSensor(CoordinatorEntity[ElectricityPriceCoordinator], BinarySensorEntity):
+    """On while the current interval ranks within a share of the cheapest or most expensive of its day.
+
+    Reads the ranks the coordinator calculated with the prices, so moving to the
+    next interval is a lookup.
+    """
+
+    entity_description: PriceLevelEntityDescription
+
+    def __init__(
+            self,
+            coordinator: ElectricityPriceCoordinator,
+            unique_id: str,
+            description: PriceLevelEntityDescription,
+    ):
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_name = f"{NAME} {description.name}"
+        self._attr_unique_id = f"{unique_id}_{description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Run when the entity is added to Home Assistant."""
+        await super().async_added_to_hass()
+        self._update_level()
+        self.async_on_remove(
+            async_track_utc_time_change(
+                self.hass, self._async_interval_tick, minute=INTERVAL_MINUTES, second=0
+            )
+        )
+
+    @core.callback
+    def _async_interval_tick(self, now: datetime) -> None:
+        previous = self._attr_is_on
+        self._update_level()
+        if self._attr_is_on != previous:
+            self.async_write_ha_state()
+
+    @core.callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated prices from the coordinator."""
+        self._update_level()
+        super()._handle_coordinator_update()
+
+    def _update_level(self) -> None:
+        """Set the state from the rank of the current interval."""
+        self._attr_is_on = None
+        if self.coordinator.data is None:
+            return
+        current = interval_statistics(self.coordinator.data, dt_util.utcnow().timestamp())
+        if current is None or current[0] is None:
+            return
+        statistics, i = current
+        self._attr_is_on = self.entity_description.is_on_fn(statistics, i)
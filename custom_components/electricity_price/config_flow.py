@@ -1,20 +1,49 @@
 import logging
 from typing import Any, Dict, Optional
-from pyeloverblik import Eloverblik
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from datetime import datetime, timedelta
 from functools import partial
 
+from .api import EloverblikError, get_client
 from .const import (
     CONF_PRICE_SENSOR,
     DOMAIN,
     CONF_ELOVERBLIK_TOKEN,
     CONF_METERING_POINT,
+    CONF_TARIFF_TTL,
+    CONF_ATTRIBUTE_FORMAT,
+    CONF_RECORD_PRICE_ATTRIBUTES,
+    CONF_CHEAPEST_WINDOW,
+    CONF_IMPORT_STATISTICS,
+    CONF_FORECAST,
+    CONF_CONSUMPTION_COST,
+    CONF_MQTT_TOPIC,
+    CONF_TAX,
+    CONF_CHARGE,
+    CONF_TRANSPORT_LOW,
+    CONF_TRANSPORT_HIGH,
+    CONF_TRANSPORT_PEAK,
+    CONF_LOW_LOAD_TIMES,
+    CONF_HIGH_LOAD_TIMES,
+    CONF_PEAK_LOAD_TIMES,
+    DEFAULT_TARIFF_TTL,
+    DEFAULT_CHEAPEST_WINDOW,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_FORECAST,
+    DEFAULT_CONSUMPTION_COST,
+    DEFAULT_MQTT_TOPIC,
+    DEFAULT_TAX,
+    DEFAULT_CHARGE,
+    ATTRIBUTE_FORMAT_NORDPOOL,
+    ATTRIBUTE_FORMATS,
+    TARIFF_CURRENCY,
 )
+from .spot_prices import SpotSeries
+from .validation_helpers import hour_ranges_validation, number_validation, percentage_validation
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +61,10 @@ ELOVERBLIK_SCHEMA = vol.Schema(
 )
 
 
+class UnsupportedCurrency(ValueError):
+    """The prices of a sensor are in a currency that can't be converted to the currency of the tariffs."""
+
+
 async def async_validate_sensor(sensor: str, hass: HomeAssistant) -> None:
     """Validates a Home Assistant Nordpool sensor.
     https://github.com/custom-components/nordpool
@@ -48,31 +81,37 @@ async def async_validate_sensor(sensor: str, hass: HomeAssistant) -> None:
         required_keys = ["current_price", "raw_today", "unit"]
         if not all(key in attributes for key in required_keys):
             raise ValueError("Sensor attributes invalid")
+        currency = SpotSeries.from_attributes(attributes).currency
+        if currency not in (None, TARIFF_CURRENCY):
+            raise UnsupportedCurrency(f"Prices in {currency} can't be converted to {TARIFF_CURRENCY}")
     except Exception as e:
         _LOGGER.error("Sensor validation failed: %s", e)
         raise
 
 async def validate_eloverblik(hass: HomeAssistant, token: str, metering_point: str) -> None:
-    """Try to log in and get the metering point at https://api.eloverblik.dk/CustomerApi/
+    """Try to log in and get the tariffs of the metering point at https://api.eloverblik.dk/CustomerApi/
     Raises ValueError if it can't (typically meaning either token or metering point is wrong)."""
-    _LOGGER.debug("Validating Eloverblik with token: %s, metering_point: %s", token, metering_point)
-
-    def validate():
-        """Blocking function for validation."""
-        client = Eloverblik(token)
-        # Corrected to remove unsupported parameters
-        data = client.get_latest(metering_point)
-
-        if int(data.status) != 200:
-            raise ValueError("Invalid API response")
-        return data
+    _LOGGER.debug("Validating Eloverblik for metering_point: %s", metering_point)
 
     try:
-        # Run the blocking operation in a thread pool
-        await hass.async_add_executor_job(validate)
-    except Exception as e:
+        await get_client(hass, token).async_get_tariffs(metering_point)
+    except EloverblikError as e:
         _LOGGER.error("Eloverblik validation failed: %s", e)
-        raise
+        raise ValueError("Invalid token or metering point") from e
+
+
+def validate_price_formula(user_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate the fee and VAT options with the validation helpers.
+    Raises vol.Invalid if any of them is invalid."""
+    validated = dict(user_input)
+    validated[CONF_TAX] = percentage_validation(user_input.get(CONF_TAX, DEFAULT_TAX))
+    if not 0 <= validated[CONF_TAX] <= 100:
+        raise vol.Invalid("VAT must be between 0 and 100 %")
+    for key in (CONF_CHARGE, CONF_TRANSPORT_LOW, CONF_TRANSPORT_HIGH, CONF_TRANSPORT_PEAK):
+        validated[key] = number_validation(user_input.get(key, 0))
+    for key in (CONF_LOW_LOAD_TIMES, CONF_HIGH_LOAD_TIMES, CONF_PEAK_LOAD_TIMES):
+        hour_ranges_validation(user_input.get(key, ""))
+    return validated
 
 
 class ElectricityPriceConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -80,16 +119,22 @@ class ElectricityPriceConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     data: Optional[Dict[str, Any]]
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry):
+        """Get the options flow for this handler."""
+        return ElectricityPriceOptionsFlow()
+
     async def async_step_user(self, user_input: Optional[Dict[str, Any]] = None):
         """Handle the initial step."""
         _LOGGER.debug("Starting async_step_user")
         errors: Dict[str, str] = {}
-        await self.async_set_unique_id("total_electricity_price_per_hour")
-        self._abort_if_unique_id_configured()
         if user_input:
             _LOGGER.debug("User input: %s", user_input)
             try:
                 await async_validate_sensor(user_input[CONF_PRICE_SENSOR], self.hass)
+            except UnsupportedCurrency:
+                errors["base"] = "unsupported_currency"
             except ValueError:
                 errors["base"] = "invalid_price_sensor"
             if self.hass.states.get(user_input[CONF_PRICE_SENSOR]) is None:
@@ -128,9 +173,72 @@ class ElectricityPriceConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             except ValueError:
                 errors["base"] = "invalid_eloverblik"
             if not errors:
+                # Several entries are allowed, one per (metering point, price sensor) pair.
+                await self.async_set_unique_id(
+                    f"{user_input[CONF_METERING_POINT]}_{self.data[CONF_PRICE_SENSOR]}"
+                )
+                self._abort_if_unique_id_configured()
                 self.data.update(user_input)
                 return self.async_create_entry(title="Electricity Price", data=self.data)
 
         return self.async_show_form(
             step_id="eloverblik", data_schema=ELOVERBLIK_SCHEMA, errors=errors
         )
+
+
+class ElectricityPriceOptionsFlow(config_entries.OptionsFlow):
+    """Electricity price options flow."""
+
+    async def async_step_init(self, user_input: Optional[Dict[str, Any]] = None):
+        """Manage the options."""
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            try:
+                return self.async_create_entry(data=validate_price_formula(user_input))
+            except vol.Invalid as e:
+                _LOGGER.debug("Invalid price formula: %s", e)
+                errors["base"] = "invalid_price_formula"
+
+        options = user_input or self.config_entry.options
+        options_schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_TARIFF_TTL,
+                    default=options.get(CONF_TARIFF_TTL, DEFAULT_TARIFF_TTL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_ATTRIBUTE_FORMAT,
+                    default=options.get(CONF_ATTRIBUTE_FORMAT, ATTRIBUTE_FORMAT_NORDPOOL),
+                ): vol.In(ATTRIBUTE_FORMATS),
+                vol.Optional(
+                    CONF_RECORD_PRICE_ATTRIBUTES,
+                    default=options.get(CONF_RECORD_PRICE_ATTRIBUTES, True),
+                ): bool,
+                vol.Optional(
+                    CONF_CHEAPEST_WINDOW,
+                    default=options.get(CONF_CHEAPEST_WINDOW, DEFAULT_CHEAPEST_WINDOW),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=24)),
+                vol.Optional(
+                    CONF_IMPORT_STATISTICS,
+                    default=options.get(CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS),
+                ): bool,
+                vol.Optional(
+                    CONF_FORECAST,
+                    default=options.get(CONF_FORECAST, DEFAULT_FORECAST),
+                ): bool,
+                vol.Optional(
+                    CONF_CONSUMPTION_COST,
+                    default=options.get(CONF_CONSUMPTION_COST, DEFAULT_CONSUMPTION_COST),
+                ): bool,
+                vol.Optional(CONF_MQTT_TOPIC, default=options.get(CONF_MQTT_TOPIC, DEFAULT_MQTT_TOPIC)): str,
+                vol.Optional(CONF_TAX, default=options.get(CONF_TAX, DEFAULT_TAX)): vol.Coerce(float),
+                vol.Optional(CONF_CHARGE, default=options.get(CONF_CHARGE, DEFAULT_CHARGE)): vol.Coerce(float),
+                vol.Optional(CONF_TRANSPORT_LOW, default=options.get(CONF_TRANSPORT_LOW, 0.0)): vol.Coerce(float),
+                vol.Optional(CONF_LOW_LOAD_TIMES, default=options.get(CONF_LOW_LOAD_TIMES, "")): str,
+                vol.Optional(CONF_TRANSPORT_HIGH, default=options.get(CONF_TRANSPORT_HIGH, 0.0)): vol.Coerce(float),
+                vol.Optional(CONF_HIGH_LOAD_TIMES, default=options.get(CONF_HIGH_LOAD_TIMES, "")): str,
+                vol.Optional(CONF_TRANSPORT_PEAK, default=options.get(CONF_TRANSPORT_PEAK, 0.0)): vol.Coerce(float),
+                vol.Optional(CONF_PEAK_LOAD_TIMES, default=options.get(CONF_PEAK_LOAD_TIMES, "")): str,
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=options_schema, errors=errors)
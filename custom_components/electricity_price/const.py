@@ -1,6 +1,7 @@
 DOMAIN = "electricity_price"
 NAME = "Total Electricity Price"
 ENTITY_ID = "sensor.total_electricity_price"
+LEGACY_UNIQUE_ID = "total_electricity_price_per_hour"
 
 CONF_TAX = "tax"
 CONF_CHARGE = "charge"
@@ -43,6 +44,14 @@ CONF_TRANSPORT_PEAK = "transport_peak"
 CONF_ELOVERBLIK_TOKEN = "eloverblik_token"
 CONF_METERING_POINT = "metering_point"
 CONF_PRICE_SENSOR = "price_sensor"
+CONF_TARIFF_TTL = "tariff_ttl"
+CONF_ATTRIBUTE_FORMAT = "attribute_format"
+CONF_RECORD_PRICE_ATTRIBUTES = "record_price_attributes"
+CONF_CHEAPEST_WINDOW = "cheapest_window"
+CONF_IMPORT_STATISTICS = "import_statistics"
+CONF_FORECAST = "forecast"
+CONF_CONSUMPTION_COST = "consumption_cost"
+CONF_MQTT_TOPIC = "mqtt_topic"
 
 ATTR_STATE_CLASS = "state_class"
 ATTR_AVERAGE = "average"
@@ -66,8 +75,61 @@ ATTR_SYSTEMTARIF = "systemtarif"
 ATTR_ELAFGIFT = "elafgift"
 ATTR_HOUR_NETTARIF = "nettarif_c_time"
 ATTR_TOMORROW_VALID = "tomorrow_valid"
+ATTR_START = "start"
+ATTR_INTERVAL = "interval"
+ATTR_PRICES = "prices"
+ATTR_END = "end"
+ATTR_MIN = "min"
+ATTR_MAX = "max"
+ATTR_PERCENTILES = "percentiles"
+ATTR_TOMORROW_STATISTICS = "tomorrow_statistics"
+ATTR_RANK_TODAY = "rank_today"
+ATTR_RANK_TOMORROW = "rank_tomorrow"
+ATTR_RANKS = "ranks"
+ATTR_FORECAST = "forecast"
+ATTR_CONSUMPTION = "consumption"
+ATTR_DATE = "date"
+ATTR_DAYS = "days"
+ATTR_UNPRICED_DAYS = "unpriced_days"
 
 # Default values
 CURRENCY = "DKK"
 COUNTRY = "Denmark"
+# Currency of the Eloverblik tariffs
+TARIFF_CURRENCY = "DKK"
+# Tariff currency per unit of the other currencies spot prices are converted from.
+# DKK is pegged to EUR, so the ERM II central rate is used.
+EXCHANGE_RATES = {"EUR": 7.46038}
 ICON = "mdi:flash"
+DEFAULT_TARIFF_TTL = 24  # hours
+DEFAULT_CHEAPEST_WINDOW = 0  # hours, 0 for no cheapest window sensor
+DEFAULT_IMPORT_STATISTICS = True
+DEFAULT_FORECAST = False
+DEFAULT_CONSUMPTION_COST = False
+DEFAULT_MQTT_TOPIC = ""  # no MQTT publishing
+DEFAULT_TAX = 25.0  # percent VAT
+DEFAULT_CHARGE = 0.0  # supplier markup per kWh
+
+# Attribute formats
+ATTRIBUTE_FORMAT_NORDPOOL = "nordpool"
+ATTRIBUTE_FORMAT_COMPACT = "compact"
+ATTRIBUTE_FORMATS = [ATTRIBUTE_FORMAT_NORDPOOL, ATTRIBUTE_FORMAT_COMPACT]
+
+# Services
+SERVICE_FIND_CHEAPEST_WINDOW = "find_cheapest_window"
+SERVICE_BACKTEST = "backtest"
+
+# Keys in hass.data[DOMAIN]
+DATA_TARIFF_CACHE = "tariff_cache"
+DATA_COORDINATORS = "coordinators"
+DATA_CLIENTS = "clients"
+DATA_SPOT_SOURCES = "spot_sources"
+DATA_FORECASTERS = "forecasters"
+DATA_PRICING_EXECUTOR = "pricing_executor"
+DATA_METER_DATA = "meter_data"
+DATA_PRICE_ARCHIVES = "price_archives"
+DATA_STATISTICS_IMPORTERS = "statistics_importers"
+# Key in the per entry data
+DATA_COORDINATOR = "coordinator"
+DATA_COST_COORDINATOR = "cost_coordinator"
+DATA_PRICE_STREAM = "price_stream"
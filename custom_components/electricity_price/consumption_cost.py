@@ -0,0 +1,130 @@
+"""
+Cost of the consumption of a metering point at the calculated prices
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+import logging
+import math
+from typing import Any, NamedTuple
+
+from homeassistant import config_entries, core
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    ATTR_CURRENCY,
+    CONF_ELOVERBLIK_TOKEN,
+    CONF_METERING_POINT,
+    CURRENCY,
+    DOMAIN,
+)
+from .coordinator import ElectricityPriceCoordinator
+from .meter_data import LOOKBACK_DAYS, get_meter_data_cache
+from .price_archive import get_price_archive
+from .pricing import consumption_costs
+from .pricing_executor import get_pricing_executor
+
+_LOGGER = logging.getLogger(__name__)
+
+# Eloverblik has new consumption once a day; the meter data cache limits the requests.
+COST_UPDATE_INTERVAL = timedelta(hours=1)
+
+DATA_DAYS = "days"
+DATA_MONTH_START = "month_start"
+DATA_UNPRICED_DAYS = "unpriced_days"
+
+
+class DayCost(NamedTuple):
+    """Consumption in kWh and its cost over one or more days."""
+
+    consumption: float
+    cost: float
+
+
+def _aligns(consumption: int, intervals: int) -> bool:
+    """Return True if consumption values can be aligned to the price intervals of a day."""
+    return consumption > 0 and intervals > 0 and (intervals % consumption == 0 or consumption % intervals == 0)
+
+
+def last_day_cost(data: dict[str, Any]) -> tuple[date, DayCost] | None:
+    """Return the last day with consumption and its cost, if any."""
+    days = data[DATA_DAYS]
+    if not days:
+        return None
+    day = max(days)
+    return day, days[day]
+
+
+def month_to_date_cost(data: dict[str, Any]) -> DayCost:
+    """Return the consumption and cost of the current month so far."""
+    costs = [cost for day, cost in data[DATA_DAYS].items() if day >= data[DATA_MONTH_START]]
+    return DayCost(
+        round(math.fsum(cost.consumption for cost in costs), 3),
+        math.fsum(cost.cost for cost in costs),
+    )
+
+
+class ConsumptionCostCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Cost of each day of consumption of a metering point, this and last month.
+
+    The consumption of each day from Eloverblik is joined with the archived total
+    prices of the same day, and all days are costed in one batch in the pricing
+    executor.
+    """
+
+    def __init__(
+            self,
+            hass: core.HomeAssistant,
+            price_coordinator: ElectricityPriceCoordinator,
+            config_entry: config_entries.ConfigEntry,
+    ):
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=config_entry,
+            name=f"{DOMAIN} cost {price_coordinator.config[CONF_METERING_POINT]}",
+            update_interval=COST_UPDATE_INTERVAL,
+        )
+        self.price_coordinator = price_coordinator
+        self.config = price_coordinator.config
+        self.archive = get_price_archive(hass, self.config)
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Archive the current prices, fetch new consumption and cost every day with both."""
+        await self.archive.async_load()
+        price_data = self.price_coordinator.data
+        if price_data is not None:
+            self.archive.async_record(price_data)
+
+        today = self.price_coordinator.calendar.today().day
+        month_start = today.replace(day=1)
+        # Early in the month, the last days of the previous month are the latest with consumption.
+        first_day = min(month_start, today - timedelta(days=LOOKBACK_DAYS))
+        consumption = await get_meter_data_cache(self.hass).async_get(
+            self.config[CONF_ELOVERBLIK_TOKEN], self.config[CONF_METERING_POINT], first_day, today
+        )
+        await self.archive.async_backfill(self.price_coordinator, consumption)
+
+        days: list[tuple[date, list[float], list[float]]] = []
+        unpriced: list[date] = []
+        for day, values in sorted(consumption.items()):
+            prices = self.archive.get(day)
+            if prices is None or not _aligns(len(values), len(prices)):
+                unpriced.append(day)
+            else:
+                days.append((day, values, prices))
+        if unpriced:
+            _LOGGER.debug("No prices for the consumption of %s", unpriced)
+
+        costs = await get_pricing_executor(self.hass).async_run(
+            consumption_costs, [(values, prices) for _, values, prices in days]
+        )
+        return {
+            DATA_DAYS: {
+                day: DayCost(round(math.fsum(values), 3), cost)
+                for (day, values, _), cost in zip(days, costs)
+            },
+            DATA_MONTH_START: month_start,
+            DATA_UNPRICED_DAYS: unpriced,
+            ATTR_CURRENCY: price_data[ATTR_CURRENCY] if price_data else CURRENCY,
+        }
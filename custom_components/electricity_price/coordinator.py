@@ -0,0 +1,525 @@
+"""
+Shared data update coordinator for total electricity prices
+"""
+from __future__ import annotations
+
+from array import array
+import asyncio
+import hashlib
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Sequence
+
+from homeassistant import core
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_PRICE_SENSOR,
+    CONF_ELOVERBLIK_TOKEN,
+    CONF_METERING_POINT,
+    CONF_TARIFF_TTL,
+    CONF_FORECAST,
+    ATTR_TODAY,
+    ATTR_TOMORROW,
+    ATTR_RAW_TODAY,
+    ATTR_RAW_TOMORROW,
+    ATTR_REGION,
+    ATTR_CURRENCY,
+    ATTR_COUNTRY,
+    ATTR_LAST_UPDATED,
+    ATTR_TOMORROW_VALID,
+    ATTR_FORECAST,
+    DEFAULT_TARIFF_TTL,
+    DEFAULT_FORECAST,
+    DOMAIN,
+    CURRENCY,
+    COUNTRY,
+    TARIFF_CURRENCY,
+)
+from .instrumentation import (
+    COUNTER_PRICED_DAY_CACHE_HITS,
+    COUNTER_PRICED_DAYS,
+    COUNTER_SKIPPED_UPDATES,
+    COUNTER_SUPERSEDED_UPDATES,
+    TIMER_CALCULATE_TOTAL,
+    TIMER_FETCH_TARIFFS,
+    TIMER_FORECAST,
+    TIMER_UPDATE,
+    TIMER_WAIT_FOR_SENSOR,
+    Instrumentation,
+)
+from .forecast import get_forecaster
+from .interval_index import IntervalIndex
+from .price_statistics import DayStatistics, day_statistics
+from .price_formula import CompiledFormula, PriceFormula
+from .pricing import BACKEND_PYTHON, fused_prices
+from .pricing_executor import get_pricing_executor
+from .slot_calendar import SlotCalendar, get_slot_calendar
+from .spot_prices import SpotSeries, get_spot_source
+from .tariff_cache import TariffFetchError, get_tariff_cache
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(minutes=10)
+
+DATA_TARIFFS = "tariffs"
+DATA_INTERVAL_INDEX = "interval_index"
+DATA_TODAY_START = "today_start"
+DATA_PRICE_VERSION = "price_version"
+DATA_STATISTICS = "statistics"
+DATA_SOURCE = "source"
+DATA_FORECAST = "forecast_days"
+
+
+def price_version(
+        today_start: datetime,
+        region: str,
+        tariff_version: str | None,
+        today: Sequence[float],
+        tomorrow: Sequence[float],
+        forecast: Sequence[tuple[date, Sequence[float]]] = (),
+) -> str:
+    """Return a content hash of everything the published prices depend on."""
+    digest = hashlib.sha1(f"{today_start.isoformat()}|{region}|{tariff_version}|{len(today)}|".encode())
+    digest.update(array("d", today).tobytes())
+    digest.update(array("d", tomorrow).tobytes())
+    for day, prices in forecast:
+        digest.update(f"|{day.isoformat()}|".encode())
+        digest.update(array("d", prices).tobytes())
+    return digest.hexdigest()[:12]
+
+
+def interval_statistics(data: dict[str, Any], timestamp: float) -> tuple[DayStatistics, int] | None:
+    """Return the statistics of the day of the interval containing the epoch timestamp,
+    and the position of the interval in that day.
+    """
+    i = data[DATA_INTERVAL_INDEX].index_at(timestamp)
+    if i is None:
+        return None
+    today_length = len(data[ATTR_TODAY])
+    if i < today_length:
+        return data[DATA_STATISTICS][ATTR_TODAY], i
+    return data[DATA_STATISTICS][ATTR_TOMORROW], i - today_length
+
+
+def price_day(
+        day: date, raw: Sequence[float], formula: CompiledFormula, time_zone: str, backend: str = BACKEND_PYTHON
+) -> list[float]:
+    """Calculate total prices for the spot prices of one local day with fees and VAT in one batch."""
+    _LOGGER.debug("Pricing %d intervals for %s", len(raw), day)
+    return fused_prices(
+        raw, formula.fixed_fees, formula.variable_fees(day, time_zone, len(raw)), formula.multiplier, backend
+    )
+
+
+class _UpdateSuperseded(Exception):
+    """A newer update was triggered while an update was running."""
+
+
+class _SensorUnavailable(Exception):
+    """The price sensor has no prices, and there are previous or restored prices to keep serving."""
+
+
+def _has_prices(state: core.State | None) -> bool:
+    """Return True if a price sensor state has prices for today."""
+    return state is not None and bool(state.attributes.get("today"))
+
+
+class ElectricityPriceCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Fetch tariffs and calculate total prices once per (metering point, price sensor) pair.
+
+    All entities subscribing to the coordinator share the result, so adding
+    entities or config entries for the same pair adds no API calls or calculations.
+    """
+
+    def __init__(self, hass: core.HomeAssistant, config: dict[str, Any]):
+        super().__init__(
+            hass,
+            _LOGGER,
+            # Shared between config entries, so not bound to any single one.
+            config_entry=None,
+            name=f"{DOMAIN} {config[CONF_METERING_POINT]} {config[CONF_PRICE_SENSOR]}",
+            update_interval=SCAN_INTERVAL,
+            request_refresh_debouncer=Debouncer(
+                hass,
+                _LOGGER,
+                cooldown=0.1,  # 100ms cooldown to batch multiple triggers
+                immediate=True,  # Allow an immediate update on the first call
+            ),
+            # Listeners are only called when the data actually changes.
+            always_update=False,
+        )
+        self.config = config
+        # Config entries (or "yaml") using this coordinator.
+        self.subscribers: set[str] = set()
+        # Priced days by (date, raw prices), valid for the tariff version.
+        self._priced_days: dict[tuple[date, tuple[float, ...]], list[float]] = {}
+        self._tariff_version: str | None = None
+        # Fees and VAT from the options, compiled with the tariffs of the tariff version.
+        self.formula = PriceFormula.from_config(config)
+        self._compiled_formula: CompiledFormula | None = None
+        self.metrics = Instrumentation()
+        # Last price sensor state with prices, and a future for updates waiting for one.
+        self._last_good_state: core.State | None = None
+        self._sensor_ready: asyncio.Future[core.State] | None = None
+        # One update at a time; each trigger bumps the generation, superseding the running update.
+        self._update_lock = asyncio.Lock()
+        self._update_generation = 0
+        self._unsub_tariffs = get_tariff_cache(hass).async_register(
+            config[CONF_ELOVERBLIK_TOKEN], config[CONF_METERING_POINT]
+        )
+        self._unsub_price_sensor = async_track_state_change_event(
+            hass, config[CONF_PRICE_SENSOR], self._async_price_sensor_changed
+        )
+
+    @property
+    def calendar(self) -> SlotCalendar:
+        """Return the calendar of the local days in the Home Assistant time zone."""
+        return get_slot_calendar(self.hass.config.time_zone)
+
+    @core.callback
+    def async_shutdown_listeners(self) -> None:
+        """Stop listening to the price sensor once the last subscriber is gone."""
+        self._unsub_price_sensor()
+        self._unsub_tariffs()
+
+    async def _async_price_sensor_changed(self, event: core.Event) -> None:
+        """Update prices when the Nordpool sensor updates."""
+        if not (new_state := event.data.get("new_state")):
+            return
+
+        old_state = event.data.get("old_state")
+        _LOGGER.debug(
+            "State or attributes changed for %s: %s -> %s",
+            event.data.get("entity_id"),
+            old_state.attributes if old_state else None,
+            new_state.attributes,
+        )
+
+        if _has_prices(new_state):
+            self._last_good_state = new_state
+            # Wake up an update waiting for the sensor to appear.
+            if self._sensor_ready is not None and not self._sensor_ready.done():
+                self._sensor_ready.set_result(new_state)
+
+        # Stop a running update at its next stage; the update scheduled below uses the new state.
+        self._update_generation += 1
+        # Schedule the debounced update
+        await self.async_request_refresh()
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch tariffs and calculate the total prices, one update at a time.
+
+        Triggers arriving while an update runs coalesce into a single update after
+        it, and the running update stops at its next stage, as its result would be
+        replaced anyway. The first update always runs to the end.
+        """
+        self._update_generation += 1
+        generation = self._update_generation
+        async with self._update_lock:
+            try:
+                self._raise_if_superseded(generation)
+                with self.metrics.timer(TIMER_UPDATE):
+                    return await self._async_calculate_data(generation)
+            except _UpdateSuperseded:
+                _LOGGER.debug("Update of %s superseded by a newer trigger", self.name)
+                self.metrics.increment(COUNTER_SUPERSEDED_UPDATES)
+                return self.data
+            except _SensorUnavailable:
+                # The state change listener refreshes as soon as the sensor has prices.
+                _LOGGER.info(
+                    "Price sensor '%s' is not available yet, keeping the last prices",
+                    self.config[CONF_PRICE_SENSOR],
+                )
+                return self.data
+
+    def _raise_if_superseded(self, generation: int) -> None:
+        """Raise _UpdateSuperseded if the update has been superseded and there is data to keep serving."""
+        if generation != self._update_generation and self.data is not None:
+            raise _UpdateSuperseded
+
+    async def _async_calculate_data(self, generation: int) -> dict[str, Any]:
+        """Fetch tariffs and calculate the total prices, reusing the previous data if unchanged."""
+        try:
+            with self.metrics.timer(TIMER_FETCH_TARIFFS):
+                tariffs = await self.fetch_tariffs()  # Fetch tariffs via Eloverblik
+        except TariffFetchError as e:
+            raise UpdateFailed(str(e)) from e
+
+        self._raise_if_superseded(generation)
+        total_prices = await self.calculate_total(tariffs)
+        self._raise_if_superseded(generation)
+        # Region, currency and country of the price sensor
+        source = total_prices[DATA_SOURCE]
+
+        today_start = self.calendar.today().start_time
+
+        # Keep the previous data, and so skip state writes, when the published prices are unchanged.
+        version = price_version(
+            today_start,
+            f"{source[ATTR_REGION]}|{source[ATTR_CURRENCY]}",
+            self._tariff_version,
+            total_prices[ATTR_TODAY],
+            total_prices[ATTR_TOMORROW],
+            total_prices[DATA_FORECAST],
+        )
+        if self.data is not None and version == self.data[DATA_PRICE_VERSION]:
+            _LOGGER.debug("Prices for %s unchanged, skipping update", self.name)
+            self.metrics.increment(COUNTER_SKIPPED_UPDATES)
+            return self.data
+
+        # Timestamps and statistics of every interval are built off the event loop.
+        return await get_pricing_executor(self.hass).async_run(
+            self._build_data,
+            today_start,
+            total_prices[ATTR_TODAY],
+            total_prices[ATTR_TOMORROW],
+            source,
+            tariffs,
+            version,
+            # When the prices last changed, not when they were last polled.
+            dt_util.now().isoformat(),
+            total_prices[DATA_FORECAST],
+        )
+
+    def _build_data(
+            self,
+            today_start: datetime,
+            today: list[float],
+            tomorrow: list[float],
+            source: dict[str, str | None],
+            tariffs: dict[str, Any],
+            version: str,
+            last_updated: str,
+            forecast: Sequence[tuple[date, list[float]]] = (),
+    ) -> dict[str, Any]:
+        """Build the data shared with the entities from the prices of today and tomorrow,
+        and the estimated prices of the following days not yet published.
+        """
+        today_slots = self.calendar.day(today_start.date())
+        tomorrow_slots = self.calendar.day(today_start.date() + timedelta(days=1))
+        return {
+            ATTR_TODAY: today,
+            ATTR_TOMORROW: tomorrow,
+            # Add start and end timestamps to total_prices
+            ATTR_RAW_TODAY: today_slots.time_stamps(today),
+            ATTR_RAW_TOMORROW: tomorrow_slots.time_stamps(tomorrow),
+            # True if tomorrows prices are available.
+            ATTR_TOMORROW_VALID: bool(tomorrow),
+            ATTR_REGION: source[ATTR_REGION],
+            # Currency and country of the prices, with the defaults for prices stored without them.
+            ATTR_CURRENCY: source.get(ATTR_CURRENCY) or CURRENCY,
+            ATTR_COUNTRY: source.get(ATTR_COUNTRY) or COUNTRY,
+            DATA_TARIFFS: tariffs,
+            DATA_TODAY_START: today_start,
+            # Today and tomorrow as one index, so the state moves past midnight without a recalculation.
+            DATA_INTERVAL_INDEX: IntervalIndex.from_days(
+                ((today_slots.start_time, today), (tomorrow_slots.start_time, tomorrow))
+            ),
+            DATA_PRICE_VERSION: version,
+            # Calculated once per price change, so entities and templates only read them.
+            DATA_STATISTICS: {ATTR_TODAY: day_statistics(today), ATTR_TOMORROW: day_statistics(tomorrow)},
+            ATTR_LAST_UPDATED: last_updated,
+            # Estimated total prices by day, continuing the published days.
+            DATA_FORECAST: list(forecast),
+            ATTR_FORECAST: [
+                slot for day, prices in forecast for slot in self.calendar.day(day).time_stamps(prices, estimate=True)
+            ],
+        }
+
+    @core.callback
+    def as_stored_data(self) -> dict[str, Any] | None:
+        """Return the current prices in a JSON serializable form for restoring after a restart."""
+        if self.data is None:
+            return None
+        return {
+            "today_start": self.data[DATA_TODAY_START].isoformat(),
+            ATTR_TODAY: self.data[ATTR_TODAY],
+            ATTR_TOMORROW: self.data[ATTR_TOMORROW],
+            ATTR_REGION: self.data[ATTR_REGION],
+            ATTR_CURRENCY: self.data[ATTR_CURRENCY],
+            ATTR_COUNTRY: self.data[ATTR_COUNTRY],
+            DATA_TARIFFS: self.data[DATA_TARIFFS],
+            DATA_PRICE_VERSION: self.data[DATA_PRICE_VERSION],
+            ATTR_LAST_UPDATED: self.data[ATTR_LAST_UPDATED],
+        }
+
+    @core.callback
+    def async_restore_data(self, stored: dict[str, Any]) -> bool:
+        """Serve prices stored before a restart until the first update has finished.
+
+        Prices stored yesterday are restored with yesterday's tomorrow as today.
+        Returns False if the stored prices are too old to be of use.
+        """
+        if self.data is not None:
+            return True
+        try:
+            stored_start = dt_util.parse_datetime(stored["today_start"])
+            today, tomorrow = stored[ATTR_TODAY], stored[ATTR_TOMORROW]
+            today_start = self.calendar.today().start_time
+            if stored_start.date() == today_start.date() - timedelta(days=1) and tomorrow:
+                today, tomorrow = tomorrow, []
+            elif stored_start.date() != today_start.date():
+                return False
+            self.data = self._build_data(
+                today_start,
+                today,
+                tomorrow,
+                {key: stored.get(key) for key in (ATTR_REGION, ATTR_CURRENCY, ATTR_COUNTRY)},
+                stored[DATA_TARIFFS],
+                stored[DATA_PRICE_VERSION],
+                stored[ATTR_LAST_UPDATED],
+            )
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            _LOGGER.debug("Unable to restore prices for %s: %s", self.name, e)
+            return False
+        _LOGGER.debug("Restored prices for %s from %s", self.name, stored_start)
+        return True
+
+    async def fetch_tariffs(self) -> dict:
+        """Fetch tariffs from Eloverblik, through the shared tariff cache.
+
+        Raises TariffFetchError if the API fails and no tariffs are cached, rather
+        than returning an empty dict that would zero every fee.
+        """
+        ttl = timedelta(hours=self.config.get(CONF_TARIFF_TTL, DEFAULT_TARIFF_TTL))
+        return await get_tariff_cache(self.hass).async_get(
+            self.config.get(CONF_ELOVERBLIK_TOKEN),
+            self.config.get(CONF_METERING_POINT),
+            ttl,
+        )
+
+    async def wait_for_sensor(self, sensor_id, timeout=30):
+        """Return the price sensor state, waiting for the sensor to appear if needed.
+
+        Returns the current state if it has prices, else the last state that had
+        prices. Only without either does it wait, until the state change listener
+        sees the sensor or the timeout passes.
+        """
+        state = self.hass.states.get(sensor_id)
+        if _has_prices(state):
+            self._last_good_state = state
+            return state
+        if self._last_good_state is not None:
+            _LOGGER.debug("Sensor '%s' has no prices, using its last known prices", sensor_id)
+            return self._last_good_state
+
+        _LOGGER.debug("Waiting for sensor '%s' to become available", sensor_id)
+        if self._sensor_ready is None or self._sensor_ready.done():
+            self._sensor_ready = self.hass.loop.create_future()
+        try:
+            async with asyncio.timeout(timeout):
+                return await asyncio.shield(self._sensor_ready)
+        except TimeoutError:
+            _LOGGER.debug("Sensor '%s' did not become available within %s seconds", sensor_id, timeout)
+            return None
+
+    async def calculate_total(self, tariffs):
+        """Calculate the total electricity prices, including fees and VAT.
+
+        Each day is priced on its own and cached by (date, raw prices) for the
+        current tariff version, so unchanged days are never repriced, a newly
+        published tomorrow only prices tomorrow and at midnight yesterday's
+        tomorrow becomes today as is.
+        """
+        sensor_id = self.config.get(CONF_PRICE_SENSOR)
+        with self.metrics.timer(TIMER_WAIT_FOR_SENSOR):
+            price_sensor_state = await self.wait_for_sensor(sensor_id)
+
+        if price_sensor_state is None:
+            if self.data is not None:
+                # E.g. prices restored at startup, before the Nordpool integration is set up.
+                raise _SensorUnavailable
+            # The state change listener refreshes as soon as the sensor appears.
+            raise UpdateFailed(f"Price sensor '{sensor_id}' is not available")
+
+        # Raw Nordpool prices (15‑min data), normalized once per sensor state for all coordinators
+        series = get_spot_source(self.hass, sensor_id).series(price_sensor_state)
+        if series.currency not in (None, TARIFF_CURRENCY):
+            # The tariffs can't be added to prices in a currency without an exchange rate.
+            raise UpdateFailed(
+                f"Prices of '{sensor_id}' are in {series.currency}, but the tariffs are in {TARIFF_CURRENCY}"
+            )
+        raw_today_prices = series.today
+        raw_tomorrow_prices = series.tomorrow
+
+        # Extract raw prices from the Nordpool sensor
+        if len(raw_today_prices) not in (92, 96, 100):
+            _LOGGER.debug("Unexpected number of raw_today_prices: %d (expected 92, 96 or 100)", len(raw_today_prices))
+        if len(raw_tomorrow_prices) not in (0, 92, 96, 100):
+            _LOGGER.debug("Unexpected number of raw_tomorrow_prices: %d (expected 0, 92, 96 or 100)", len(raw_tomorrow_prices))
+
+        with self.metrics.timer(TIMER_CALCULATE_TOTAL):
+            total_prices = await self._async_calculate_days(raw_today_prices, raw_tomorrow_prices, tariffs)
+        total_prices[DATA_SOURCE] = {
+            ATTR_REGION: series.region,
+            ATTR_CURRENCY: series.currency,
+            ATTR_COUNTRY: series.country,
+        }
+        total_prices[DATA_FORECAST] = []
+        if self.config.get(CONF_FORECAST, DEFAULT_FORECAST):
+            with self.metrics.timer(TIMER_FORECAST):
+                total_prices[DATA_FORECAST] = await self._async_forecast(series)
+        return total_prices
+
+    async def _async_forecast(self, series: SpotSeries) -> list[tuple[date, list[float]]]:
+        """Return the estimated total prices of the days within the next 48 hours that are not published.
+
+        The spot prices are estimated by the model shared by all coordinators of
+        the price sensor and priced like published days.
+        """
+        today = self.calendar.today().day
+        published = [(today, series.today)]
+        if series.tomorrow:
+            published.append((today + timedelta(days=1), series.tomorrow))
+        estimates = await get_forecaster(self.hass, self.config[CONF_PRICE_SENSOR]).async_forecast(today, published)
+        priced = await get_pricing_executor(self.hass).async_run(self._price_days, estimates)
+        return [(day, prices) for (day, _), prices in zip(estimates, priced)]
+
+    async def _async_calculate_days(
+            self, raw_today_prices: Sequence[float], raw_tomorrow_prices: Sequence[float], tariffs: dict
+    ) -> dict[str, Any]:
+        """Price today and tomorrow, reusing days priced before.
+
+        Days not priced before are priced in the pricing executor.
+        """
+        # Start over when the tariffs change.
+        version = get_tariff_cache(self.hass).version(self.config.get(CONF_METERING_POINT))
+        if version != self._tariff_version or self._compiled_formula is None:
+            self._priced_days.clear()
+            self._tariff_version = version
+            self._compiled_formula = self.formula.compile(tariffs)
+
+        today = self.calendar.today().day
+        keys = [(today, tuple(raw_today_prices))]
+        if raw_tomorrow_prices:
+            keys.append((today + timedelta(days=1), tuple(raw_tomorrow_prices)))
+        missing = [key for key in keys if key not in self._priced_days]
+        if len(missing) < len(keys):
+            self.metrics.increment(COUNTER_PRICED_DAY_CACHE_HITS, len(keys) - len(missing))
+        if missing:
+            self.metrics.increment(COUNTER_PRICED_DAYS, len(missing))
+            priced = await get_pricing_executor(self.hass).async_run(self._price_days, missing)
+            self._priced_days.update(zip(missing, priced))
+        # Only keep the days currently published.
+        for key in self._priced_days.keys() - set(keys):
+            del self._priced_days[key]
+
+        return {
+            ATTR_TODAY: self._priced_days[keys[0]],
+            ATTR_TOMORROW: self._priced_days[keys[1]] if len(keys) > 1 else [],
+            "total_fees": {
+                "fixed": round(self._compiled_formula.fixed, 3),
+            },
+        }
+
+    def _price_day(self, day: date, raw: Sequence[float]) -> list[float]:
+        """Calculate total prices for one day with fees and VAT in one batch."""
+        return price_day(day, raw, self._compiled_formula, self.hass.config.time_zone)
+
+    def _price_days(self, days: Sequence[tuple[date, Sequence[float]]]) -> list[list[float]]:
+        """Calculate total prices for several days; runs in the pricing executor."""
+        return [self._price_day(day, raw) for day, raw in days]
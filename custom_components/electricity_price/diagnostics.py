@@ -0,0 +1,33 @@
+"""
+Diagnostics support for Electricity Price
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant import config_entries, core
+from homeassistant.components.diagnostics import async_redact_data
+
+from .const import CONF_ELOVERBLIK_TOKEN, DATA_COORDINATOR, DOMAIN
+from .coordinator import DATA_PRICE_VERSION
+from .tariff_cache import get_tariff_cache
+
+TO_REDACT = {CONF_ELOVERBLIK_TOKEN}
+
+
+async def async_get_config_entry_diagnostics(
+        hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id][DATA_COORDINATOR]
+    return {
+        "config": async_redact_data({**entry.data, **entry.options}, TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "last_exception": repr(coordinator.last_exception) if coordinator.last_exception else None,
+            "price_version": coordinator.data[DATA_PRICE_VERSION] if coordinator.data else None,
+            "subscribers": len(coordinator.subscribers),
+            "metrics": coordinator.metrics.as_dict(),
+        },
+        "tariff_cache": get_tariff_cache(hass).metrics.as_dict(),
+    }
@@ -0,0 +1,202 @@
+"""
+Estimated spot prices for the days not yet published
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, timedelta
+import logging
+from typing import Any, Iterable, Sequence
+
+from homeassistant import core
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import DATA_FORECASTERS, DOMAIN
+from .pricing_executor import get_pricing_executor
+from .slot_calendar import get_slot_calendar
+from .tariff_schedule import profile_positions
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Seconds to wait before writing a refitted model, so a burst of fits is written once.
+STORAGE_SAVE_DELAY = 60
+
+HOURS_PER_WEEK = 7 * 24
+SLOT_MINUTES = 15
+# Days of price sensor history the model is first fitted on.
+FIT_DAYS = 28
+# Days after today that are estimated while not published, covering the next 24 to 48 hours.
+FORECAST_DAYS = 2
+# Weight of the newest day in the hour-of-week profile and in the price level.
+PROFILE_WEIGHT = 0.25
+LEVEL_WEIGHT = 0.5
+
+
+class HourOfWeekModel:
+    """Spot prices as a recent daily level plus a deviation for each of the 168 hours of the week.
+
+    Both are exponentially weighted averages, so fitting a day is one pass over
+    its prices and the history is never needed again.
+    """
+
+    def __init__(
+            self,
+            level: float | None = None,
+            profile: Sequence[float | None] | None = None,
+            fitted_through: date | None = None,
+    ):
+        self.level = level
+        self.profile: list[float | None] = list(profile) if profile else [None] * HOURS_PER_WEEK
+        self.fitted_through = fitted_through
+
+    @property
+    def ready(self) -> bool:
+        """Return True once the model has been fitted on at least one day."""
+        return self.level is not None
+
+    def fit_day(self, day: date, prices: Sequence[float], time_zone: str) -> None:
+        """Fit the spot prices of a local day, of hourly or 15-minute intervals, newer than any fitted before."""
+        if not prices or (self.fitted_through is not None and day <= self.fitted_through):
+            return
+        mean = sum(prices) / len(prices)
+        slot_minutes = 60 if len(prices) in (23, 24, 25) else SLOT_MINUTES
+        hours: dict[int, list[float]] = {}
+        for hour, price in zip(profile_positions(day, time_zone, len(prices), slot_minutes, 24), prices):
+            hours.setdefault(hour, []).append(price)
+
+        first = day.weekday() * 24
+        for hour, values in hours.items():
+            deviation = sum(values) / len(values) - mean
+            previous = self.profile[first + hour]
+            self.profile[first + hour] = (
+                deviation if previous is None else previous + PROFILE_WEIGHT * (deviation - previous)
+            )
+        self.level = mean if self.level is None else self.level + LEVEL_WEIGHT * (mean - self.level)
+        self.fitted_through = day
+
+    def predict_day(self, day: date, time_zone: str) -> list[float]:
+        """Return the estimated spot price of each 15-minute interval of a local day."""
+        first = day.weekday() * 24
+        intervals = len(get_slot_calendar(time_zone).day(day))
+        positions = profile_positions(day, time_zone, intervals, SLOT_MINUTES, 24)
+        return [round(self.level + (self.profile[first + hour] or 0.0), 5) for hour in positions]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "level": self.level,
+            "profile": self.profile,
+            "fitted_through": self.fitted_through.isoformat() if self.fitted_through else None,
+        }
+
+    @classmethod
+    def from_dict(cls, stored: dict[str, Any]) -> HourOfWeekModel:
+        fitted_through = stored.get("fitted_through")
+        return cls(
+            level=stored.get("level"),
+            profile=stored.get("profile"),
+            fitted_through=date.fromisoformat(fitted_through) if fitted_through else None,
+        )
+
+
+class SpotForecaster:
+    """Hour-of-week model of the spot prices of one price sensor, shared by every coordinator using it.
+
+    First fitted on the recorded history of the price sensor, then refitted on
+    each newly published day, so at most once per day. The model is stored, so a
+    restart does not refit it. Fitting and estimating run in the pricing
+    executor, fitting the recorded history in the recorder executor.
+    """
+
+    def __init__(self, hass: core.HomeAssistant, entity_id: str):
+        self.hass = hass
+        self.entity_id = entity_id
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.forecast_{slugify(entity_id)}"
+        )
+        self._model: HourOfWeekModel | None = None
+        self._lock = asyncio.Lock()
+        # Estimates by the days estimated and the last day fitted.
+        self._estimates: list[tuple[date, list[float]]] = []
+        self._estimates_key: tuple[date | None, tuple[date, ...]] | None = None
+
+    async def async_forecast(
+            self, today: date, published: Sequence[tuple[date, Sequence[float]]]
+    ) -> list[tuple[date, list[float]]]:
+        """Return the estimated spot prices of the days up to FORECAST_DAYS after today that are not published.
+
+        Fits the model on published days it has not seen first. Returns no days
+        until the model has been fitted.
+        """
+        async with self._lock:
+            if self._model is None:
+                self._model = await self._async_load()
+            await self._async_fit(today, published)
+            if not self._model.ready:
+                return []
+
+            published_days = {day for day, _ in published}
+            days = tuple(
+                day
+                for day in (today + timedelta(days=n) for n in range(1, FORECAST_DAYS + 1))
+                if day not in published_days
+            )
+            key = (self._model.fitted_through, days)
+            if key != self._estimates_key:
+                self._estimates = await get_pricing_executor(self.hass).async_run(self._predict, days)
+                self._estimates_key = key
+            return self._estimates
+
+    async def _async_load(self) -> HourOfWeekModel:
+        stored = await self._store.async_load()
+        return HourOfWeekModel.from_dict(stored) if stored else HourOfWeekModel()
+
+    async def _async_fit(self, today: date, published: Sequence[tuple[date, Sequence[float]]]) -> None:
+        """Fit the days missed since the last fit from the recorded history, then the published days."""
+        model = self._model
+        new_days = [
+            (day, prices)
+            for day, prices in published
+            if prices and (model.fitted_through is None or day > model.fitted_through)
+        ]
+        if not new_days:
+            return
+
+        first_day = today - timedelta(days=FIT_DAYS)
+        if model.fitted_through is not None:
+            first_day = max(first_day, model.fitted_through + timedelta(days=1))
+        if first_day < new_days[0][0] and "recorder" in self.hass.config.components:
+            await self._async_fit_history(first_day, new_days[0][0])
+
+        await get_pricing_executor(self.hass).async_run(self._fit_days, new_days)
+        _LOGGER.debug("Fitted the forecast of %s through %s", self.entity_id, model.fitted_through)
+        self._store.async_delay_save(model.as_dict, STORAGE_SAVE_DELAY)
+
+    async def _async_fit_history(self, first_day: date, end_day: date) -> None:
+        """Fit the recorded days from ``first_day`` up to ``end_day``, one day at a time in the recorder executor."""
+        from homeassistant.components.recorder import get_instance
+
+        from .backtest import recorded_spot_days
+
+        await get_instance(self.hass).async_add_executor_job(
+            self._fit_days, recorded_spot_days(self.hass, self.entity_id, first_day, end_day)
+        )
+
+    def _fit_days(self, days: Iterable[tuple[date, Sequence[float]]]) -> None:
+        time_zone = self.hass.config.time_zone
+        for day, prices in days:
+            self._model.fit_day(day, prices, time_zone)
+
+    def _predict(self, days: Sequence[date]) -> list[tuple[date, list[float]]]:
+        time_zone = self.hass.config.time_zone
+        return [(day, self._model.predict_day(day, time_zone)) for day in days]
+
+
+@core.callback
+def get_forecaster(hass: core.HomeAssistant, entity_id: str) -> SpotForecaster:
+    """Return the spot price forecaster of a price sensor, shared by all config entries."""
+    forecasters = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_FORECASTERS, {})
+    if entity_id not in forecasters:
+        forecasters[entity_id] = SpotForecaster(hass, entity_id)
+    return forecasters[entity_id]
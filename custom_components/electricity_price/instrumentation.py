@@ -0,0 +1,98 @@
+"""
+Lightweight timing and counters for the update path
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Iterator
+
+# Upper bounds of the latency buckets in seconds; the last bucket is unbounded.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+# Timers
+TIMER_FETCH_TARIFFS = "fetch_tariffs"
+TIMER_WAIT_FOR_SENSOR = "wait_for_sensor"
+TIMER_CALCULATE_TOTAL = "calculate_total"
+TIMER_FORECAST = "forecast"
+TIMER_UPDATE = "update"
+TIMER_STATE_WRITE = "state_write"
+
+# Counters
+COUNTER_API_CALLS = "api_calls"
+COUNTER_API_FAILURES = "api_failures"
+COUNTER_TARIFF_CACHE_HITS = "tariff_cache_hits"
+COUNTER_STALE_TARIFFS_SERVED = "stale_tariffs_served"
+COUNTER_PRICED_DAYS = "priced_days"
+COUNTER_PRICED_DAY_CACHE_HITS = "priced_day_cache_hits"
+COUNTER_SKIPPED_UPDATES = "skipped_updates"
+COUNTER_SUPERSEDED_UPDATES = "superseded_updates"
+
+
+class LatencyHistogram:
+    """Count of observed durations per latency bucket."""
+
+    __slots__ = ("buckets", "count", "total", "last", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "last_ms": round(self.last * 1000, 3),
+            "mean_ms": round(self.mean * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "buckets": {
+                f"le_{bound}" if i < len(LATENCY_BUCKETS) else "inf": count
+                for i, (bound, count) in enumerate(zip(LATENCY_BUCKETS + (None,), self.buckets))
+            },
+        }
+
+
+class Instrumentation:
+    """Latency histograms and counters, cheap enough to always be on."""
+
+    def __init__(self):
+        self.timers: dict[str, LatencyHistogram] = {}
+        self.counters: Counter[str] = Counter()
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the enclosed block, also when it raises."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start)
+
+    def observe(self, name: str, seconds: float) -> None:
+        if name not in self.timers:
+            self.timers[name] = LatencyHistogram()
+        self.timers[name].observe(seconds)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "timers": {name: histogram.as_dict() for name, histogram in self.timers.items()},
+            "counters": dict(self.counters),
+        }
@@ -0,0 +1,58 @@
+"""
+Precomputed index of price intervals for constant time current price lookups
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from typing import Iterable, Sequence
+
+SLOT_SECONDS = 15 * 60
+
+
+class IntervalIndex:
+    """Interval start times as epoch seconds, with the price of each interval.
+
+    Built once per price calculation, after which finding the current interval is
+    a bisect over the start times instead of parsing timestamps.
+    """
+
+    __slots__ = ("starts", "prices", "slot_seconds")
+
+    def __init__(self, starts: array, prices: Sequence[float], slot_seconds: int = SLOT_SECONDS):
+        self.starts = starts
+        self.prices = prices
+        self.slot_seconds = slot_seconds
+
+    @classmethod
+    def from_days(
+            cls, days: Iterable[tuple[datetime, Sequence[float]]], slot_seconds: int = SLOT_SECONDS
+    ) -> IntervalIndex:
+        """Build an index from (start of local day, prices) pairs.
+
+        Intervals are consecutive from the start of each day in absolute time, so
+        23 and 25 hour days are handled by the number of prices alone.
+        """
+        starts = array("d")
+        prices: list[float] = []
+        for day_start, day_prices in days:
+            first = day_start.timestamp()
+            starts.extend(first + slot_seconds * i for i in range(len(day_prices)))
+            prices.extend(day_prices)
+        return cls(starts, prices, slot_seconds)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def index_at(self, timestamp: float) -> int | None:
+        """Return the index of the interval containing the epoch timestamp, if any."""
+        i = bisect_right(self.starts, timestamp) - 1
+        if i < 0 or timestamp >= self.starts[i] + self.slot_seconds:
+            return None
+        return i
+
+    def price_at(self, timestamp: float) -> float | None:
+        """Return the price of the interval containing the epoch timestamp, if any."""
+        i = self.index_at(timestamp)
+        return None if i is None else self.prices[i]
@@ -0,0 +1,170 @@
+"""
+Import of the calculated prices into long-term statistics
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+import logging
+from typing import Any, Iterable, Sequence
+
+from homeassistant import core
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMeanType, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+from homeassistant.util import dt as dt_util, slugify
+
+from .backtest import TariffVersion, priced_days, recorded_spot_days
+from .const import (
+    ATTR_TODAY,
+    ATTR_TOMORROW,
+    ATTR_CURRENCY,
+    CONF_METERING_POINT,
+    CONF_PRICE_SENSOR,
+    DOMAIN,
+    NAME,
+)
+from .coordinator import (
+    DATA_PRICE_VERSION,
+    DATA_TODAY_START,
+    ElectricityPriceCoordinator,
+)
+from .price_formula import PriceFormula
+from .pricing_executor import get_pricing_executor
+from .tariff_cache import TariffFetchError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Days of Nordpool sensor history priced when nothing has been imported yet.
+BACKFILL_DAYS = 30
+HOUR_SECONDS = 3600
+
+
+def statistic_id(config: dict[str, Any]) -> str:
+    """Return the external statistic id for a (metering point, price sensor) pair."""
+    price_sensor = config[CONF_PRICE_SENSOR].split(".", 1)[-1]
+    return f"{DOMAIN}:{slugify(f'total_price {config[CONF_METERING_POINT]} {price_sensor}')}"
+
+
+def hourly_statistics(day_start: datetime, prices: Sequence[float]) -> list[StatisticData]:
+    """Return the mean, min and max total price of each hour of a local day.
+
+    Long-term statistics are hourly, so 15-minute prices are aggregated per hour.
+    Hourly prices are imported as is.
+    """
+    slot_seconds = HOUR_SECONDS if len(prices) in (23, 24, 25) else 15 * 60
+    first = day_start.timestamp()
+    hours: dict[float, list[float]] = {}
+    for i, price in enumerate(prices):
+        start = first + i * slot_seconds
+        hours.setdefault(start - start % HOUR_SECONDS, []).append(price)
+    return [
+        StatisticData(
+            start=dt_util.utc_from_timestamp(hour),
+            mean=round(sum(values) / len(values), 3),
+            min=min(values),
+            max=max(values),
+        )
+        for hour, values in hours.items()
+    ]
+
+
+def backfill_statistics(
+        days: Iterable[tuple[date, list[float]]],
+        tariffs: dict[str, Any],
+        time_zone: str,
+        formula: PriceFormula,
+) -> list[StatisticData]:
+    """Return the hourly statistics of recorded spot days, all priced with the same tariffs."""
+    statistics: list[StatisticData] = []
+    for day, prices in priced_days(days, [TariffVersion(date.min, tariffs)], time_zone, formula):
+        statistics.extend(hourly_statistics(dt_util.start_of_local_day(day), prices))
+    return statistics
+
+
+class PriceStatisticsImporter:
+    """Writes the prices of a coordinator to an external long-term statistic.
+
+    Charts then read compact hourly rows instead of decoding the price
+    attributes of every recorded state. Each price change imports today and
+    tomorrow again, overwriting the hours already imported. The first import
+    also backfills the days since the last imported hour from the recorded
+    Nordpool sensor history.
+    """
+
+    def __init__(self, hass: core.HomeAssistant, coordinator: ElectricityPriceCoordinator):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.statistic_id = statistic_id(coordinator.config)
+        self._imported_version: str | None = None
+        self._backfilled = False
+
+    def metadata(self, currency: str) -> StatisticMetaData:
+        """Return the statistic metadata, with the unit in the currency of the prices."""
+        return StatisticMetaData(
+            has_mean=True,
+            mean_type=StatisticMeanType.ARITHMETIC,
+            has_sum=False,
+            name=NAME,
+            source=DOMAIN,
+            statistic_id=self.statistic_id,
+            unit_class=None,
+            unit_of_measurement=f"{currency}/kWh",
+        )
+
+    @core.callback
+    def async_schedule_import(self) -> None:
+        """Import the prices when the coordinator has new ones; a coordinator listener."""
+        data = self.coordinator.data
+        if data is None or data[DATA_PRICE_VERSION] == self._imported_version:
+            return
+        self._imported_version = data[DATA_PRICE_VERSION]
+        self.hass.async_create_background_task(
+            self._async_import(data), f"{DOMAIN} import statistics {self.statistic_id}"
+        )
+
+    async def _async_import(self, data: dict[str, Any]) -> None:
+        today_start = data[DATA_TODAY_START]
+        if not self._backfilled:
+            self._backfilled = True
+            await self._async_backfill(today_start.date(), data[ATTR_CURRENCY])
+
+        tomorrow_start = dt_util.start_of_local_day(today_start.date() + timedelta(days=1))
+        statistics = hourly_statistics(today_start, data[ATTR_TODAY])
+        statistics.extend(hourly_statistics(tomorrow_start, data[ATTR_TOMORROW]))
+        async_add_external_statistics(self.hass, self.metadata(data[ATTR_CURRENCY]), statistics)
+
+    async def _async_backfill(self, today: date, currency: str) -> None:
+        """Import the days before today missing from the statistic, from the Nordpool sensor history.
+
+        Eloverblik only has the tariffs currently in effect, so past days are
+        priced with the cached tariffs.
+        """
+        recorder = get_instance(self.hass)
+        last = await recorder.async_add_executor_job(
+            get_last_statistics, self.hass, 1, self.statistic_id, True, {"mean"}
+        )
+        if last.get(self.statistic_id):
+            last_start = dt_util.utc_from_timestamp(last[self.statistic_id][0]["start"])
+            first_day = dt_util.as_local(last_start).date() + timedelta(days=1)
+        else:
+            first_day = today - timedelta(days=BACKFILL_DAYS)
+        if first_day >= today:
+            return
+
+        days = await recorder.async_add_executor_job(
+            lambda: list(recorded_spot_days(self.hass, self.coordinator.config[CONF_PRICE_SENSOR], first_day, today))
+        )
+        if not days:
+            return
+        try:
+            tariffs = await self.coordinator.fetch_tariffs()
+        except TariffFetchError as e:
+            _LOGGER.warning("Unable to backfill %s without tariffs: %s", self.statistic_id, e)
+            return
+
+        # Pricing weeks of intervals is kept off the event loop.
+        statistics = await get_pricing_executor(self.hass).async_run(
+            backfill_statistics, days, tariffs, self.hass.config.time_zone, self.coordinator.formula
+        )
+        _LOGGER.debug("Backfilling %d days of %s from %s", len(days), self.statistic_id, first_day)
+        async_add_external_statistics(self.hass, self.metadata(currency), statistics)
@@ -0,0 +1,131 @@
+"""
+Persistent, incrementally fetched cache of meter data from Eloverblik
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, timedelta
+import logging
+from typing import Any, Iterable
+
+from homeassistant import core
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import EloverblikError, MeterPeriod, get_client
+from .const import DATA_METER_DATA, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.meter_data"
+SAVE_DELAY = 10  # seconds
+
+# Eloverblik has the consumption of a day one to a few days later, so days
+# missing within this many days of the last request are requested again.
+LOOKBACK_DAYS = 7
+# Days of consumption kept, enough for this and the previous month.
+RETENTION_DAYS = 62
+MIN_FETCH_INTERVAL = timedelta(hours=6)
+
+
+def local_days(periods: Iterable[MeterPeriod]) -> dict[date, list[float]]:
+    """Return the consumption of each local day from meter data periods, one per local day."""
+    days: dict[date, list[float]] = {}
+    for period in periods:
+        days.setdefault(dt_util.as_local(period.start).date(), []).extend(period.quantities)
+    return days
+
+
+class MeterDataCache:
+    """Consumption per metering point and local day, persisted across restarts.
+
+    Days are only requested from Eloverblik once: each fetch requests the days
+    from the first one missing up to today, at most every MIN_FETCH_INTERVAL.
+    """
+
+    def __init__(self, hass: core.HomeAssistant):
+        self.hass = hass
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # Per metering point, the consumption by ISO date, the end of the last requested range and when it was requested.
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def _async_load(self) -> None:
+        """Load persisted meter data on first use."""
+        if self._loaded:
+            return
+        data = await self._store.async_load()
+        if data:
+            self._entries = data.get("entries", {})
+        self._loaded = True
+
+    @core.callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"entries": self._entries}
+
+    async def async_get(
+            self, token: str, metering_point: str, first_day: date, today: date
+    ) -> dict[date, list[float]]:
+        """Return the consumption of each day from ``first_day`` before today that Eloverblik has.
+
+        Requests the days not cached yet. If that fails, the cached days are
+        returned.
+        """
+        async with self._lock:
+            await self._async_load()
+            entry = self._entries.setdefault(metering_point, {"days": {}, "requested_until": None, "fetched": None})
+            days = entry["days"]
+
+            start = first_day
+            if entry["requested_until"] is not None:
+                start = max(first_day, date.fromisoformat(entry["requested_until"]) - timedelta(days=LOOKBACK_DAYS))
+            missing = next(
+                (day for day in _date_range(start, today) if day.isoformat() not in days), None
+            )
+            now = dt_util.utcnow()
+            if missing is not None and (
+                    entry["fetched"] is None or now - dt_util.parse_datetime(entry["fetched"]) >= MIN_FETCH_INTERVAL
+            ):
+                await self._async_fetch(token, metering_point, entry, missing, today)
+
+            return {
+                day: days[day.isoformat()]
+                for day in _date_range(first_day, today)
+                if day.isoformat() in days
+            }
+
+    async def _async_fetch(
+            self, token: str, metering_point: str, entry: dict[str, Any], first_day: date, end_day: date
+    ) -> None:
+        """Request the days from ``first_day`` up to ``end_day`` and add them to the cache."""
+        _LOGGER.debug("Fetching meter data of %s from %s to %s", metering_point, first_day, end_day)
+        try:
+            periods = await get_client(self.hass, token).async_get_time_series(metering_point, first_day, end_day)
+        except EloverblikError as e:
+            _LOGGER.warning("Failed to fetch meter data for %s: %s", metering_point, e)
+            return
+        entry["fetched"] = dt_util.utcnow().isoformat()
+        entry["requested_until"] = end_day.isoformat()
+        for day, quantities in local_days(periods).items():
+            entry["days"][day.isoformat()] = quantities
+        oldest = (end_day - timedelta(days=RETENTION_DAYS)).isoformat()
+        entry["days"] = {day: values for day, values in entry["days"].items() if day >= oldest}
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+
+def _date_range(first_day: date, end_day: date) -> Iterable[date]:
+    day = first_day
+    while day < end_day:
+        yield day
+        day += timedelta(days=1)
+
+
+@core.callback
+def get_meter_data_cache(hass: core.HomeAssistant) -> MeterDataCache:
+    """Return the meter data cache shared by all config entries."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if DATA_METER_DATA not in data:
+        data[DATA_METER_DATA] = MeterDataCache(hass)
+    return data[DATA_METER_DATA]
@@ -0,0 +1,61 @@
+"""
+Cheapest time windows over the calculated prices
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from heapq import nsmallest
+from typing import NamedTuple, Sequence
+
+from .interval_index import IntervalIndex
+
+
+class Window(NamedTuple):
+    """A contiguous run of intervals, by index of its first interval."""
+
+    start: int
+    slots: int
+    total: float
+
+
+def cheapest_window(prices: Sequence[float], slots: int, first: int = 0, last: int | None = None) -> Window | None:
+    """Return the cheapest run of ``slots`` consecutive prices within ``prices[first:last]``.
+
+    One pass with a sliding sum, so it is linear in the number of prices whatever
+    the window length. The earliest window wins ties. Returns None if the range
+    is shorter than the window.
+    """
+    last = len(prices) if last is None else min(last, len(prices))
+    if slots <= 0 or last - first < slots:
+        return None
+    total = sum(prices[first:first + slots])
+    best = Window(first, slots, total)
+    for i in range(first + slots, last):
+        total += prices[i] - prices[i - slots]
+        if total < best.total:
+            best = Window(i - slots + 1, slots, total)
+    # Sum the winner again, so drift from the sliding sum never reaches the result.
+    return best._replace(total=sum(prices[best.start:best.start + slots]))
+
+
+def cheapest_slots(prices: Sequence[float], slots: int, first: int = 0, last: int | None = None) -> list[int]:
+    """Return the indices of the ``slots`` cheapest prices within ``prices[first:last]``, in time order.
+
+    Selected with a heap, so only ``slots`` prices are kept in order instead of
+    sorting the whole range. Earlier intervals win ties. Returns an empty list
+    if the range has fewer prices than asked for.
+    """
+    last = len(prices) if last is None else min(last, len(prices))
+    if slots <= 0 or last - first < slots:
+        return []
+    return sorted(nsmallest(slots, range(first, last), key=prices.__getitem__))
+
+
+def slot_range(index: IntervalIndex, start: float, end: float | None = None) -> tuple[int, int]:
+    """Return the range of indices of the intervals starting at or after ``start``
+    and ending at or before ``end``, given as epoch timestamps.
+    """
+    first = bisect_left(index.starts, start)
+    if end is None:
+        return first, len(index)
+    return first, max(first, bisect_right(index.starts, end - index.slot_seconds))
@@ -0,0 +1,124 @@
+"""
+Persisted total prices of past days, for pricing consumption after the fact
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+import logging
+from typing import Any, Iterable
+
+from homeassistant import core
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import ATTR_TODAY, ATTR_TOMORROW, CONF_METERING_POINT, CONF_PRICE_SENSOR, DATA_PRICE_ARCHIVES, DOMAIN
+from .coordinator import DATA_TODAY_START, ElectricityPriceCoordinator
+from .pricing_executor import get_pricing_executor
+from .tariff_cache import TariffFetchError
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60  # seconds
+# Days of prices kept, enough for this and the previous month.
+RETENTION_DAYS = 62
+
+
+class PriceArchive:
+    """Total prices of each local day for a (metering point, price sensor) pair.
+
+    The prices of a day are recorded while it is today or tomorrow, as last
+    published. Days from before the archive existed are priced from the
+    recorded Nordpool sensor history with the current tariffs.
+    """
+
+    def __init__(self, hass: core.HomeAssistant, key: str):
+        self.hass = hass
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.prices_{key}")
+        self._days: dict[str, list[float]] = {}
+        self._loaded = False
+        # Days already looked up in the price sensor history, so each is only looked up once.
+        self._backfilled: set[date] = set()
+
+    async def async_load(self) -> None:
+        """Load the archived prices on first use."""
+        if self._loaded:
+            return
+        data = await self._store.async_load()
+        if data:
+            self._days = data.get("days", {})
+        self._loaded = True
+
+    @core.callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"days": self._days}
+
+    @core.callback
+    def async_record(self, data: dict[str, Any]) -> None:
+        """Record today's and tomorrow's prices from the data of a price coordinator."""
+        today = data[DATA_TODAY_START].date()
+        days = {today: data[ATTR_TODAY], today + timedelta(days=1): data[ATTR_TOMORROW]}
+        changed = False
+        for day, prices in days.items():
+            if prices and self._days.get(day.isoformat()) != prices:
+                self._days[day.isoformat()] = list(prices)
+                changed = True
+        if changed:
+            oldest = (today - timedelta(days=RETENTION_DAYS)).isoformat()
+            self._days = {day: prices for day, prices in self._days.items() if day >= oldest}
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def get(self, day: date) -> list[float] | None:
+        """Return the archived prices of a day, if any."""
+        return self._days.get(day.isoformat())
+
+    async def async_backfill(self, coordinator: ElectricityPriceCoordinator, days: Iterable[date]) -> None:
+        """Price days missing from the archive from the recorded Nordpool sensor history.
+
+        Eloverblik only has the tariffs currently in effect, so the days are
+        priced with the cached tariffs.
+        """
+        missing = sorted(day for day in days if day.isoformat() not in self._days and day not in self._backfilled)
+        if not missing or "recorder" not in self.hass.config.components:
+            return
+        self._backfilled.update(missing)
+        from homeassistant.components.recorder import get_instance
+
+        from .backtest import TariffVersion, priced_days, recorded_spot_days
+
+        try:
+            tariffs = await coordinator.fetch_tariffs()
+        except TariffFetchError as e:
+            _LOGGER.warning("Unable to price past days without tariffs: %s", e)
+            return
+        recorded = await get_instance(self.hass).async_add_executor_job(
+            lambda: [
+                (day, prices)
+                for day, prices in recorded_spot_days(
+                    self.hass, coordinator.config[CONF_PRICE_SENSOR], missing[0], missing[-1] + timedelta(days=1)
+                )
+                if day in missing
+            ]
+        )
+        priced = await get_pricing_executor(self.hass).async_run(
+            lambda: list(
+                priced_days(
+                    recorded, [TariffVersion(date.min, tariffs)], self.hass.config.time_zone, coordinator.formula
+                )
+            )
+        )
+        _LOGGER.debug("Priced %d past days from the price sensor history", len(priced))
+        for day, prices in priced:
+            self._days.setdefault(day.isoformat(), prices)
+        if priced:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+
+@core.callback
+def get_price_archive(hass: core.HomeAssistant, config: dict[str, Any]) -> PriceArchive:
+    """Return the price archive of a (metering point, price sensor) pair, shared by all config entries."""
+    archives = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_PRICE_ARCHIVES, {})
+    key = slugify(f"{config[CONF_METERING_POINT]} {config[CONF_PRICE_SENSOR].split('.', 1)[-1]}")
+    if key not in archives:
+        archives[key] = PriceArchive(hass, key)
+    return archives[key]
@@ -0,0 +1,108 @@
+"""
+Configurable fees and VAT, compiled to per interval vectors
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Sequence
+
+from .const import (
+    CONF_CHARGE,
+    CONF_HIGH_LOAD_TIMES,
+    CONF_LOW_LOAD_TIMES,
+    CONF_PEAK_LOAD_TIMES,
+    CONF_TAX,
+    CONF_TRANSPORT_HIGH,
+    CONF_TRANSPORT_LOW,
+    CONF_TRANSPORT_PEAK,
+    DEFAULT_CHARGE,
+    DEFAULT_TAX,
+)
+from .tariff_schedule import TariffSchedule, day_type, season
+from .validation_helpers import hour_ranges_validation
+
+# Eloverblik charges added to every interval, in the order they are added.
+FIXED_CHARGES = ("transmissions_nettarif", "systemtarif", "elafgift")
+
+
+def transport_profile(periods: Sequence[tuple[float, Sequence[tuple[int, int]]]]) -> list[float] | None:
+    """Return 24 hourly transport fees from (fee, hour ranges) periods.
+
+    Later periods take precedence where they overlap; hours in no period have no
+    fee. Returns None if no period has a fee.
+    """
+    if not any(fee for fee, _ in periods):
+        return None
+    profile = [0.0] * 24
+    for fee, ranges in periods:
+        for start, end in ranges:
+            profile[start:end] = [fee] * (end - start)
+    return profile
+
+
+@dataclass(frozen=True)
+class PriceFormula:
+    """Supplier markup, VAT and time-of-use transport fees applied on top of the spot price.
+
+    total = round(round(spot + Eloverblik charges + markup + transport fee, 3) * (1 + VAT), 3)
+    """
+
+    markup: float = DEFAULT_CHARGE
+    vat: float = DEFAULT_TAX  # percent
+    # 24 hourly transport fees used instead of the Eloverblik network tariff (nettarif C).
+    transport_fees: tuple[float, ...] | None = None
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> PriceFormula:
+        """Build the formula from options validated by the options flow."""
+        transport_fees = transport_profile(
+            [
+                (config.get(fee_key) or 0.0, hour_ranges_validation(config.get(times_key) or ""))
+                for fee_key, times_key in (
+                    (CONF_TRANSPORT_LOW, CONF_LOW_LOAD_TIMES),
+                    (CONF_TRANSPORT_HIGH, CONF_HIGH_LOAD_TIMES),
+                    (CONF_TRANSPORT_PEAK, CONF_PEAK_LOAD_TIMES),
+                )
+            ]
+        )
+        return cls(
+            markup=config.get(CONF_CHARGE, DEFAULT_CHARGE),
+            vat=config.get(CONF_TAX, DEFAULT_TAX),
+            transport_fees=tuple(transport_fees) if transport_fees else None,
+        )
+
+    def compile(self, charges: dict[str, Any]) -> CompiledFormula:
+        """Combine the formula with the Eloverblik charges of a tariff version."""
+        return CompiledFormula(self, charges)
+
+
+class CompiledFormula:
+    """A price formula for one set of charges as fixed fees, a multiplier and per interval variable fees.
+
+    The fixed fees are kept as separate terms and added to the spot price one at
+    a time, in the order the prices have always been calculated in, as summing
+    them first can round the total differently. The variable vector of a day only
+    depends on its season, day type and number of intervals, so it is built once
+    per layout.
+    """
+
+    def __init__(self, formula: PriceFormula, charges: dict[str, Any]):
+        self.formula = formula
+        # The Eloverblik charges in order, then the supplier markup.
+        self.fixed_fees = tuple(charges.get(name, 0) for name in FIXED_CHARGES) + (formula.markup,)
+        self.fixed = sum(self.fixed_fees)
+        self.multiplier = 1 + formula.vat / 100
+        if formula.transport_fees is not None:
+            self.schedule = TariffSchedule(formula.transport_fees)
+        else:
+            self.schedule = TariffSchedule.from_charges(charges)
+        self._variable_fees: dict[tuple[str, str, str, int], array] = {}
+
+    def variable_fees(self, day: date, time_zone: str, intervals: int) -> array:
+        """Return the network tariff or transport fee of each interval of a local day, added after the fixed fees."""
+        key = (season(day), day_type(day), time_zone, intervals)
+        if key not in self._variable_fees:
+            self._variable_fees[key] = self.schedule.expand(day, time_zone, intervals)
+        return self._variable_fees[key]
@@ -0,0 +1,65 @@
+"""
+Statistics of the prices of a day, calculated once per price change
+"""
+from __future__ import annotations
+
+from typing import Any, NamedTuple, Sequence
+
+from .pricing import DECIMALS
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class DayStatistics(NamedTuple):
+    """Min, max, mean and percentiles of the prices of a day, and the rank of each interval.
+
+    Rank 0 is the cheapest interval of the day; equal prices share the lowest rank.
+    """
+
+    min: float
+    max: float
+    mean: float
+    percentiles: dict[int, float]
+    ranks: list[int]
+
+    def fraction(self, i: int) -> float:
+        """Return the fraction of the intervals of the day cheaper than interval ``i``."""
+        return self.ranks[i] / len(self.ranks)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "min": self.min,
+            "max": self.max,
+            "average": self.mean,
+            "percentiles": {str(p): value for p, value in self.percentiles.items()},
+        }
+
+
+def percentile(ordered: Sequence[float], p: float) -> float:
+    """Return the p-th percentile of sorted values, interpolating linearly between them."""
+    position = (len(ordered) - 1) * p / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def day_statistics(prices: Sequence[float]) -> DayStatistics | None:
+    """Return the statistics of the prices of a day, from a single sort.
+
+    Returns None for a day without prices, e.g. tomorrow before it is published.
+    """
+    if not prices:
+        return None
+    order = sorted(range(len(prices)), key=prices.__getitem__)
+    ordered = [prices[i] for i in order]
+    ranks = [0] * len(prices)
+    for position, i in enumerate(order):
+        # Equal prices share the rank of the first of them.
+        ranks[i] = ranks[order[position - 1]] if position and ordered[position] == ordered[position - 1] else position
+    return DayStatistics(
+        min=ordered[0],
+        max=ordered[-1],
+        mean=round(sum(prices) / len(prices), DECIMALS),
+        percentiles={p: round(percentile(ordered, p), DECIMALS) for p in PERCENTILES},
+        ranks=ranks,
+    )
@@ -0,0 +1,175 @@
+"""
+Versioned push of price updates to websocket subscribers and MQTT
+"""
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+from typing import Any, Callable
+
+from homeassistant import core
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CURRENCY,
+    ATTR_CURRENT_PRICE,
+    ATTR_FORECAST,
+    ATTR_INTERVAL,
+    ATTR_LAST_UPDATED,
+    ATTR_PRICES,
+    ATTR_REGION,
+    ATTR_START,
+    ATTR_TODAY,
+    ATTR_TOMORROW,
+    ATTR_TOMORROW_VALID,
+)
+from .coordinator import (
+    DATA_FORECAST,
+    DATA_INTERVAL_INDEX,
+    DATA_PRICE_VERSION,
+    DATA_TODAY_START,
+    ElectricityPriceCoordinator,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Minutes past the hour of the interval boundaries, where the current interval is pushed.
+INTERVAL_MINUTES = (0, 15, 30, 45)
+
+ATTR_VERSION = "version"
+ATTR_INDEX = "index"
+EVENT_PRICES = "prices"
+EVENT_CURRENT = "current"
+
+
+def prices_message(data: dict[str, Any], version: int) -> dict[str, Any]:
+    """Return all prices in the compact layout: the start of today, minutes per price
+    and one flat list for today and tomorrow, followed by the estimates if any.
+    """
+    return {
+        ATTR_VERSION: version,
+        ATTR_START: data[DATA_TODAY_START].isoformat(),
+        ATTR_INTERVAL: data[DATA_INTERVAL_INDEX].slot_seconds // 60,
+        ATTR_PRICES: data[ATTR_TODAY] + data[ATTR_TOMORROW],
+        ATTR_FORECAST: [price for _, prices in data[DATA_FORECAST] for price in prices],
+        ATTR_TOMORROW_VALID: data[ATTR_TOMORROW_VALID],
+        ATTR_CURRENCY: data[ATTR_CURRENCY],
+        ATTR_REGION: data[ATTR_REGION],
+        ATTR_LAST_UPDATED: data[ATTR_LAST_UPDATED],
+    }
+
+
+def current_message(data: dict[str, Any], version: int, timestamp: float) -> dict[str, Any] | None:
+    """Return the current interval as its position in the prices of ``version``, if it has a price."""
+    index = data[DATA_INTERVAL_INDEX]
+    i = index.index_at(timestamp)
+    if i is None:
+        return None
+    return {
+        ATTR_VERSION: version,
+        ATTR_INDEX: i,
+        ATTR_START: dt_util.as_local(dt_util.utc_from_timestamp(index.starts[i])).isoformat(),
+        ATTR_CURRENT_PRICE: index.prices[i],
+    }
+
+
+class PriceStream:
+    """Pushes the prices of a config entry when they change, and the current interval at each boundary.
+
+    The version is incremented each time the prices change. Each current interval
+    message carries the version of the prices its index refers to, so a consumer
+    that missed a prices message can tell and ask for them again.
+    """
+
+    def __init__(self, hass: core.HomeAssistant, coordinator: ElectricityPriceCoordinator, mqtt_topic: str = ""):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.mqtt_topic = mqtt_topic.strip("/")
+        self.version = 0
+        self._price_version: str | None = None
+        self._subscribers: list[Callable[[str, dict[str, Any]], None]] = []
+
+    @core.callback
+    def async_start(self) -> Callable[[], None]:
+        """Follow the coordinator and the interval boundaries; returns a callback to stop."""
+        unsub_coordinator = self.coordinator.async_add_listener(self._handle_coordinator_update)
+        unsub_tick = async_track_utc_time_change(
+            self.hass, self._async_interval_tick, minute=INTERVAL_MINUTES, second=0
+        )
+        self._handle_coordinator_update()
+
+        @core.callback
+        def async_stop() -> None:
+            unsub_coordinator()
+            unsub_tick()
+            self._subscribers.clear()
+
+        return async_stop
+
+    @core.callback
+    def async_subscribe(self, send: Callable[[str, dict[str, Any]], None]) -> Callable[[], None]:
+        """Send the prices and the current interval, then every update; returns a callback to unsubscribe."""
+        self._subscribers.append(send)
+        data = self.coordinator.data
+        if data is not None and self.version:
+            send(EVENT_PRICES, prices_message(data, self.version))
+            current = current_message(data, self.version, dt_util.utcnow().timestamp())
+            if current is not None:
+                send(EVENT_CURRENT, current)
+
+        @core.callback
+        def async_unsubscribe() -> None:
+            if send in self._subscribers:
+                self._subscribers.remove(send)
+
+        return async_unsubscribe
+
+    @core.callback
+    def _handle_coordinator_update(self) -> None:
+        """Push all prices when they have changed, and the current interval in the new prices."""
+        data = self.coordinator.data
+        if data is None or data[DATA_PRICE_VERSION] == self._price_version:
+            return
+        self._price_version = data[DATA_PRICE_VERSION]
+        self.version += 1
+        self._publish(EVENT_PRICES, prices_message(data, self.version))
+        self._publish_current(data)
+
+    @core.callback
+    def _async_interval_tick(self, now: datetime) -> None:
+        """Push the current interval at each boundary."""
+        data = self.coordinator.data
+        if data is not None and self.version:
+            self._publish_current(data)
+
+    @core.callback
+    def _publish_current(self, data: dict[str, Any]) -> None:
+        current = current_message(data, self.version, dt_util.utcnow().timestamp())
+        if current is not None:
+            self._publish(EVENT_CURRENT, current)
+
+    @core.callback
+    def _publish(self, event: str, message: dict[str, Any]) -> None:
+        for send in list(self._subscribers):
+            send(event, message)
+        if self.mqtt_topic:
+            self.hass.async_create_task(
+                self._async_publish_mqtt(f"{self.mqtt_topic}/{event}", json_dumps(message)),
+                eager_start=True,
+            )
+
+    async def _async_publish_mqtt(self, topic: str, payload: str) -> None:
+        """Publish a retained message, so new MQTT subscribers get the latest prices and interval at once."""
+        if "mqtt" not in self.hass.config.components:
+            _LOGGER.debug("MQTT is not set up, not publishing to %s", topic)
+            return
+        # Imported here, so MQTT is only loaded when it is used.
+        from homeassistant.components import mqtt
+
+        try:
+            await mqtt.async_publish(self.hass, topic, payload, qos=0, retain=True)
+        except HomeAssistantError as e:
+            _LOGGER.warning("Failed to publish prices to %s: %s", topic, e)
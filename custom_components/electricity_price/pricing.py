@@ -0,0 +1,134 @@
+"""
+Batched total price calculation
+
+Pure functions working on flat buffers (lists, ``array.array`` or NumPy arrays) of
+spot prices and per-interval fees, so the same code prices a single day for the
+sensor and years of 15-minute history for backtesting.
+"""
+from __future__ import annotations
+
+from array import array
+import math
+from operator import mul
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+DECIMALS = 3
+SLOTS_PER_HOUR = 4
+
+BACKEND_PYTHON = "python"
+BACKEND_NUMPY = "numpy"
+# Backend for repricing recorded history, NumPy when it is installed.
+BULK_BACKEND = BACKEND_NUMPY if np is not None else BACKEND_PYTHON
+
+# Distance from a tie (x.5 after scaling) within which NumPy's scaled rounding
+# may round the other way than Python's exact decimal rounding. Far larger than
+# the error of the scaling for any price.
+TIE_TOLERANCE = 1e-6
+
+
+def align_variable_fees(fees: Sequence[float], intervals: int) -> array:
+    """Expand variable fees to one value per interval.
+
+    24 values are hourly and are repeated for each 15-minute interval. The result
+    is padded with zeros, or truncated, to exactly ``intervals`` values.
+    """
+    if len(fees) == 24:
+        expanded = array("d", [0.0]) * (24 * SLOTS_PER_HOUR)
+        for i in range(SLOTS_PER_HOUR):
+            expanded[i::SLOTS_PER_HOUR] = array("d", fees)
+    else:
+        expanded = array("d", fees)
+    if len(expanded) < intervals:
+        expanded.extend(array("d", [0.0]) * (intervals - len(expanded)))
+    return expanded[:intervals]
+
+
+def _round_array(values):
+    """Round a NumPy array to DECIMALS with the same result as Python's ``round``.
+
+    ``numpy.round`` scales, rounds and unscales, which can round values within
+    the scaling error of a tie the other way, so those are rounded by Python.
+    """
+    scaled = values * 10 ** DECIMALS
+    rounded = np.rint(scaled) / 10 ** DECIMALS
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < TIE_TOLERANCE
+    if near_tie.any():
+        rounded[near_tie] = [round(value, DECIMALS) for value in values[near_tie].tolist()]
+    return rounded
+
+
+def fused_prices(
+        spot: Sequence[float],
+        fixed_fees: Sequence[float],
+        variable_fees: Sequence[float],
+        multiplier: float,
+        backend: str = BACKEND_PYTHON,
+) -> list[float]:
+    """Calculate total prices from compiled fees, see price_formula.
+
+    Each price is ``round(round(spot + fee_1 + ... + fee_n + variable, DECIMALS) * multiplier, DECIMALS)``,
+    with the fixed fees added one at a time in the given order, so the float
+    rounding of the sum is the same as adding them in one expression.
+    ``variable_fees`` must have (at least) one value per spot price.
+
+    The NumPy backend adds and rounds whole buffers at once, with the same
+    results as the Python backend.
+    """
+    if backend == BACKEND_NUMPY:
+        if np is None:
+            raise ValueError("The NumPy backend requires numpy to be installed")
+        sums = np.asarray(spot, dtype=float)
+        for fee in fixed_fees:
+            if fee:
+                sums = sums + fee
+        sums = sums + np.asarray(variable_fees, dtype=float)[: len(sums)]
+        return _round_array(_round_array(sums) * multiplier).tolist()
+
+    sums = spot
+    for fee in fixed_fees:
+        # Adding zero is exact, so unused fees are skipped.
+        if fee:
+            sums = [p + fee for p in sums]
+    return [round(round(p + v, DECIMALS) * multiplier, DECIMALS) for p, v in zip(sums, variable_fees)]
+
+
+def align_consumption(consumption: Sequence[float], intervals: int) -> array:
+    """Return the consumption of each of ``intervals`` price intervals of a day.
+
+    Hourly consumption against 15-minute prices is spread evenly over the hour,
+    which prices it at the average price of the hour. 15-minute consumption
+    against hourly prices is summed per hour.
+    """
+    if len(consumption) == intervals:
+        return array("d", consumption)
+    if consumption and intervals % len(consumption) == 0:
+        ratio = intervals // len(consumption)
+        return array("d", [value / ratio for value in consumption for _ in range(ratio)])
+    if consumption and intervals and len(consumption) % intervals == 0:
+        ratio = len(consumption) // intervals
+        return array("d", [math.fsum(consumption[i:i + ratio]) for i in range(0, len(consumption), ratio)])
+    raise ValueError(f"Cannot align {len(consumption)} consumption values to {intervals} prices")
+
+
+def consumption_costs(days: Sequence[tuple[Sequence[float], Sequence[float]]]) -> list[float]:
+    """Return the cost of the consumption of each day at the prices of its intervals.
+
+    ``days`` are (consumption, prices) pairs. All days are aligned into one
+    consumption and one price buffer, multiplied in a single pass and the
+    products summed per day.
+    """
+    consumption = array("d")
+    prices = array("d")
+    offsets = [0]
+    for day_consumption, day_prices in days:
+        consumption.extend(align_consumption(day_consumption, len(day_prices)))
+        prices.extend(day_prices)
+        offsets.append(len(prices))
+
+    products = list(map(mul, consumption, prices))
+    return [math.fsum(products[start:end]) for start, end in zip(offsets, offsets[1:])]
@@ -0,0 +1,43 @@
+"""
+Bounded executor for CPU heavy pricing work
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, TypeVar
+
+from homeassistant import core
+
+from .const import DATA_PRICING_EXECUTOR, DOMAIN
+
+_T = TypeVar("_T")
+
+# Pricing jobs running at once in the executor, however many entries there are.
+MAX_CONCURRENT_JOBS = 2
+
+
+class PricingExecutor:
+    """Runs pricing jobs in the Home Assistant executor, a bounded number at a time.
+
+    Repricing days, backfills and forecasts stay off the event loop, and many
+    entries pricing at once queue here instead of occupying the executor
+    threads shared with the rest of Home Assistant.
+    """
+
+    def __init__(self, hass: core.HomeAssistant, max_jobs: int = MAX_CONCURRENT_JOBS):
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(max_jobs)
+
+    async def async_run(self, target: Callable[..., _T], *args: Any) -> _T:
+        """Run a job in the executor once a slot is free and return its result."""
+        async with self._semaphore:
+            return await self.hass.async_add_executor_job(target, *args)
+
+
+@core.callback
+def get_pricing_executor(hass: core.HomeAssistant) -> PricingExecutor:
+    """Return the pricing executor shared by all config entries."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if DATA_PRICING_EXECUTOR not in data:
+        data[DATA_PRICING_EXECUTOR] = PricingExecutor(hass)
+    return data[DATA_PRICING_EXECUTOR]
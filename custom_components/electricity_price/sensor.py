@@ -1,31 +1,38 @@
 from __future__ import annotations
 
-import asyncio
+from dataclasses import dataclass
 import logging
-from typing import Any
+from typing import Any, Callable
 from datetime import datetime, timedelta
-from pytz import timezone
+import math
 
-from pyeloverblik import Eloverblik
 import voluptuous as vol
 
 from homeassistant import config_entries, core
-from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorDeviceClass
-from homeassistant.const import CONF_NAME, UnitOfEnergy
+from homeassistant.components.sensor import (
+    PLATFORM_SCHEMA,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import CONF_NAME, EVENT_HOMEASSISTANT_STOP, EntityCategory, UnitOfTime
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoredExtraData, RestoreEntity
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
-from homeassistant.helpers.debounce import Debouncer
 
+from . import async_acquire_coordinator, async_release_coordinator
 from .const import (
     CONF_PRICE_SENSOR,
     DOMAIN,
     NAME,
     ENTITY_ID,
+    LEGACY_UNIQUE_ID,
     ATTR_STATE_CLASS,
-    ATTR_AVERAGE,
     ATTR_UNIT,
     ATTR_TODAY,
     ATTR_TOMORROW,
@@ -41,20 +48,76 @@ from .const import (
     ATTR_SYSTEMTARIF,
     ATTR_ELAFGIFT,
     ATTR_TOMORROW_VALID,
+    ATTR_START,
+    ATTR_INTERVAL,
+    ATTR_PRICES,
+    ATTR_END,
+    ATTR_AVERAGE,
+    ATTR_MIN,
+    ATTR_MAX,
+    ATTR_PERCENTILES,
+    ATTR_TOMORROW_STATISTICS,
+    ATTR_RANK_TODAY,
+    ATTR_RANK_TOMORROW,
+    ATTR_RANKS,
+    ATTR_FORECAST,
+    ATTR_CONSUMPTION,
+    ATTR_DATE,
+    ATTR_DAYS,
+    ATTR_UNPRICED_DAYS,
+    CONF_ATTRIBUTE_FORMAT,
+    CONF_CHEAPEST_WINDOW,
+    CONF_RECORD_PRICE_ATTRIBUTES,
+    ATTRIBUTE_FORMAT_COMPACT,
+    DEFAULT_CHEAPEST_WINDOW,
     CURRENCY,
-    COUNTRY,
     ICON,
+    DATA_COORDINATOR,
+    DATA_COST_COORDINATOR,
+)
+from .consumption_cost import (
+    DATA_DAYS,
+    DATA_MONTH_START,
+    DATA_UNPRICED_DAYS,
+    ConsumptionCostCoordinator,
+    last_day_cost,
+    month_to_date_cost,
 )
+from .coordinator import (
+    DATA_FORECAST,
+    DATA_INTERVAL_INDEX,
+    DATA_STATISTICS,
+    DATA_TARIFFS,
+    DATA_TODAY_START,
+    ElectricityPriceCoordinator,
+)
+from .instrumentation import (
+    COUNTER_API_CALLS,
+    COUNTER_API_FAILURES,
+    COUNTER_SKIPPED_UPDATES,
+    COUNTER_TARIFF_CACHE_HITS,
+    TIMER_CALCULATE_TOTAL,
+    TIMER_STATE_WRITE,
+    TIMER_UPDATE,
+    Instrumentation,
+)
+from .planning import cheapest_window
+from .tariff_cache import get_tariff_cache
 
 _LOGGER = logging.getLogger(__name__)
 
+INTERVAL_MINUTES = (0, 15, 30, 45)
+INTERVAL_LENGTH = 15  # minutes
+
+# Polling interval of the diagnostic sensors; the price sensor is updated by its coordinator.
 SCAN_INTERVAL = timedelta(minutes=10)
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_PRICE_SENSOR): cv.entity_id,
-        vol.Optional(CONF_ELOVERBLIK_TOKEN): cv.string,
-        vol.Optional(CONF_METERING_POINT): cv.string,
+        # Both are needed to fetch the tariffs, and identify the shared coordinator.
+        vol.Required(CONF_ELOVERBLIK_TOKEN): cv.string,
+        vol.Required(CONF_METERING_POINT): cv.string,
     }
 )
 
@@ -66,39 +129,168 @@ async def async_setup_entry(
 ) -> None:
     """Setup sensors from a config entry created in the integrations UI."""
     config = hass.data[DOMAIN][config_entry.entry_id]
-    # Update our config to include new repos and remove those that have been removed.
-    if config_entry.options:
-        config.async_update()
-    # session = async_get_clientsession(hass)
-    raw_sensor = config[CONF_PRICE_SENSOR]
-    sensors = [PriceSensor(hass, raw_sensor, config)]
-    async_add_entities(sensors, update_before_add=True)
+    coordinator = config[DATA_COORDINATOR]
+    # Entries created before several entries were allowed keep their original entity.
+    if config_entry.unique_id in (None, LEGACY_UNIQUE_ID):
+        unique_id = ENTITY_ID
+    else:
+        unique_id = f"{ENTITY_ID}_{config_entry.unique_id}"
+    sensor_class = PriceSensor if config.get(CONF_RECORD_PRICE_ATTRIBUTES, True) else UnrecordedPriceSensor
+    sensors: list[SensorEntity] = [sensor_class(coordinator, unique_id, config)]
+    if hours := config.get(CONF_CHEAPEST_WINDOW, DEFAULT_CHEAPEST_WINDOW):
+        sensors.append(CheapestWindowSensor(coordinator, unique_id, hours))
+    if cost_coordinator := config.get(DATA_COST_COORDINATOR):
+        sensors.extend(
+            ConsumptionCostSensor(cost_coordinator, unique_id, description) for description in COST_SENSORS
+        )
+    sensors.extend(
+        DiagnosticSensor(coordinator, unique_id, description) for description in DIAGNOSTIC_SENSORS
+    )
+    async_add_entities(sensors)
 
 
-def setup_platform(
+async def async_setup_platform(
         hass: core.HomeAssistant,
         config: dict[str, Any],
-        add_entities: AddEntitiesCallback,
+        async_add_entities: AddEntitiesCallback,
         discovery_info: dict[str, Any] | None = None,
 ) -> None:
     """Set up the sensor platform."""
-    raw_sensor = config[CONF_PRICE_SENSOR]
-    sensors = [PriceSensor(hass, raw_sensor, config)]
-    add_entities(sensors, update_before_add=True)
+    subscriber = f"yaml {config[CONF_METERING_POINT]} {config[CONF_PRICE_SENSOR]}"
+    coordinator = async_acquire_coordinator(hass, config, subscriber)
+    if coordinator.data is None:
+        hass.async_create_background_task(coordinator.async_refresh(), f"{DOMAIN} first refresh")
+
+    async def async_release(event: core.Event) -> None:
+        """Release the coordinator, as YAML sensors are only removed when Home Assistant stops."""
+        await async_release_coordinator(hass, config, subscriber)
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_release)
+    sensors = [PriceSensor(coordinator, ENTITY_ID, config)]
+    async_add_entities(sensors)
+
+
+def _mean_ms(metrics: Instrumentation, timer: str) -> float | None:
+    """Return the mean latency of a timer in milliseconds."""
+    histogram = metrics.timers.get(timer)
+    return round(histogram.mean * 1000, 3) if histogram else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class DiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes a diagnostic sensor of the update path."""
+
+    value_fn: Callable[[ElectricityPriceCoordinator], StateType]
+
+
+DIAGNOSTIC_SENSORS: tuple[DiagnosticSensorEntityDescription, ...] = (
+    DiagnosticSensorEntityDescription(
+        key="update_latency",
+        name="Update latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _mean_ms(coordinator.metrics, TIMER_UPDATE),
+    ),
+    DiagnosticSensorEntityDescription(
+        key="calculation_latency",
+        name="Calculation latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _mean_ms(coordinator.metrics, TIMER_CALCULATE_TOTAL),
+    ),
+    DiagnosticSensorEntityDescription(
+        key="state_write_latency",
+        name="State write latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _mean_ms(coordinator.metrics, TIMER_STATE_WRITE),
+    ),
+    DiagnosticSensorEntityDescription(
+        key="api_calls",
+        name="Eloverblik API calls",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: get_tariff_cache(coordinator.hass).metrics.counters[COUNTER_API_CALLS],
+    ),
+    DiagnosticSensorEntityDescription(
+        key="api_failures",
+        name="Eloverblik API failures",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: get_tariff_cache(coordinator.hass).metrics.counters[COUNTER_API_FAILURES],
+    ),
+    DiagnosticSensorEntityDescription(
+        key="tariff_cache_hits",
+        name="Tariff cache hits",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: get_tariff_cache(coordinator.hass).metrics.counters[COUNTER_TARIFF_CACHE_HITS],
+    ),
+    DiagnosticSensorEntityDescription(
+        key="skipped_updates",
+        name="Skipped updates",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.counters[COUNTER_SKIPPED_UPDATES],
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class CostSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor of the cost of the consumption over a period."""
 
+    value_fn: Callable[[dict[str, Any]], StateType]
+    last_reset_fn: Callable[[dict[str, Any]], datetime | None]
+    attributes_fn: Callable[[dict[str, Any]], dict[str, Any]]
 
-class PriceSensor(Entity):
 
-    def __init__(self, hass: core.HomeAssistant, raw_sensor: str, config):
-        super().__init__()
-        self.hass = hass
-        self.raw_sensor = raw_sensor
-        self.variable_cost: dict[str, list[float]] = {}
+def _last_day_attributes(data: dict[str, Any]) -> dict[str, Any]:
+    if (last := last_day_cost(data)) is None:
+        return {}
+    day, cost = last
+    return {ATTR_DATE: day.isoformat(), ATTR_CONSUMPTION: cost.consumption}
+
+
+def _month_attributes(data: dict[str, Any]) -> dict[str, Any]:
+    month_days = [day for day in data[DATA_DAYS] if day >= data[DATA_MONTH_START]]
+    return {
+        ATTR_CONSUMPTION: month_to_date_cost(data).consumption,
+        ATTR_DAYS: len(month_days),
+        ATTR_DATE: max(month_days).isoformat() if month_days else None,
+        ATTR_UNPRICED_DAYS: [day.isoformat() for day in data[DATA_UNPRICED_DAYS]],
+    }
+
+
+COST_SENSORS: tuple[CostSensorEntityDescription, ...] = (
+    CostSensorEntityDescription(
+        key="daily_cost",
+        name="Daily cost",
+        icon="mdi:cash-clock",
+        value_fn=lambda data: round(last[1].cost, 2) if (last := last_day_cost(data)) else None,
+        last_reset_fn=lambda data: dt_util.start_of_local_day(last[0]) if (last := last_day_cost(data)) else None,
+        attributes_fn=_last_day_attributes,
+    ),
+    CostSensorEntityDescription(
+        key="monthly_cost",
+        name="Monthly cost",
+        icon="mdi:cash-multiple",
+        value_fn=lambda data: round(month_to_date_cost(data).cost, 2),
+        last_reset_fn=lambda data: dt_util.start_of_local_day(data[DATA_MONTH_START]),
+        attributes_fn=_month_attributes,
+    ),
+)
+
+
+class PriceSensor(CoordinatorEntity[ElectricityPriceCoordinator], RestoreEntity):
+
+    def __init__(self, coordinator: ElectricityPriceCoordinator, unique_id: str, config: dict[str, Any]):
+        super().__init__(coordinator)
+        self.raw_sensor = coordinator.config[CONF_PRICE_SENSOR]
         self.attrs: dict[str, Any] = {CONF_NAME: NAME}
         self._name = NAME
         self._state = None
-        self._available = True
-        self._attr_unique_id = ENTITY_ID
+        self._attr_unique_id = unique_id
+        # Options of this entity's own entry, as the coordinator may be shared with other entries.
         self.config = config
 
     @property
@@ -111,19 +303,15 @@ class PriceSensor(Entity):
         """Return the unique ID of the sensor."""
         return self._attr_unique_id
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._available
-
     @property
     def state(self) -> str | None:
         return self._state
 
     @property
     def unit_of_measurement(self) -> str:
-        """Return the unit of measurement."""
-        return f"{CURRENCY}/kWh"
+        """Return the unit of measurement, in the currency of the price sensor."""
+        currency = self.coordinator.data[ATTR_CURRENCY] if self.coordinator.data else CURRENCY
+        return f"{currency}/kWh"
 
     @property
     def icon(self) -> str:
@@ -139,209 +327,238 @@ class PriceSensor(Entity):
     def extra_state_attributes(self) -> dict[str, Any]:
         return self.attrs
 
+    @property
+    def extra_restore_state_data(self) -> ExtraStoredData | None:
+        """Return the prices to restore after a restart."""
+        stored = self.coordinator.as_stored_data()
+        return RestoredExtraData(stored) if stored is not None else None
+
     async def async_added_to_hass(self):
         """Run when the entity is added to Home Assistant."""
         await super().async_added_to_hass()
+        # Serve the prices from before the restart until the first update has finished.
+        if self.coordinator.data is None and (stored := await self.async_get_last_extra_data()):
+            self.coordinator.async_restore_data(stored.as_dict())
+        if self.coordinator.data is not None:
+            self._update_from_data(self.coordinator.data)
 
-        self._debouncer = Debouncer(
-            self.hass,
-            _LOGGER,
-            cooldown=0.1,  # 100ms cooldown to batch multiple triggers
-            immediate=True,  # Allow an immediate update on the first call
-            function=self.async_update,  # The function to call when debouncer triggers
+        # Move the state to the next interval at each 15-minute boundary.
+        self.async_on_remove(
+            async_track_utc_time_change(
+                self.hass, self._async_interval_tick, minute=INTERVAL_MINUTES, second=0
+            )
         )
 
-        async def async_update_callback(entity_id, old_state, new_state):
-            """Update the sensor when the Nordpool sensor updates."""
-            if not new_state:
-                return
-
-            # Log the change for debugging
-            _LOGGER.debug(
-                "State or attributes changed for %s: %s -> %s",
-                entity_id,
-                old_state.attributes if old_state else None,
-                new_state.attributes if new_state else None,
-            )
+    @core.callback
+    def async_write_ha_state(self) -> None:
+        """Write the state to the state machine, timing it for the diagnostics."""
+        with self.coordinator.metrics.timer(TIMER_STATE_WRITE):
+            super().async_write_ha_state()
+
+    @core.callback
+    def _async_interval_tick(self, now: datetime) -> None:
+        """Set the state for the new interval from the cached interval index."""
+        if self.coordinator.data is None:
+            return
+        previous_state = self._state
+        self._update_state(self.coordinator.data)
+        if self._state != previous_state:
+            self.async_write_ha_state()
+
+    def _update_state(self, data: dict[str, Any]) -> None:
+        """Set the state to the price of the current interval."""
+        now = dt_util.utcnow()
+        self._state = data[DATA_INTERVAL_INDEX].price_at(now.timestamp())
+        if self._state is None:
+            _LOGGER.debug("No matching interval found for now=%s", now)
+
+    @core.callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated prices from the coordinator."""
+        if self.coordinator.data is not None:
+            self._update_from_data(self.coordinator.data)
+        super()._handle_coordinator_update()
+
+    def _update_from_data(self, data: dict[str, Any]) -> None:
+        """Set state and attributes from the coordinator data."""
+        self._update_state(data)
+
+        tariffs = data[DATA_TARIFFS]
+
+        # Populate attributes
+        self.attrs[ATTR_STATE_CLASS] = "total"
+        self.attrs[ATTR_UNIT] = "kWh"
+        self.attrs[ATTR_CURRENCY] = data[ATTR_CURRENCY]
+        self.attrs[ATTR_COUNTRY] = data[ATTR_COUNTRY]
+        self.attrs[ATTR_REGION] = data[ATTR_REGION]
+        if self.config.get(CONF_ATTRIBUTE_FORMAT) == ATTRIBUTE_FORMAT_COMPACT:
+            # Start of today, interval length in minutes and one flat array for today and tomorrow.
+            self.attrs[ATTR_START] = data[DATA_TODAY_START].isoformat()
+            self.attrs[ATTR_INTERVAL] = INTERVAL_LENGTH
+            self.attrs[ATTR_PRICES] = data[ATTR_TODAY] + data[ATTR_TOMORROW]
+            # Estimates continue the prices array at the same interval.
+            self.attrs[ATTR_FORECAST] = [price for _, prices in data[DATA_FORECAST] for price in prices]
+        else:
+            self.attrs[ATTR_TODAY] = data[ATTR_TODAY]
+            self.attrs[ATTR_TOMORROW] = data[ATTR_TOMORROW]
+            self.attrs[ATTR_RAW_TODAY] = data[ATTR_RAW_TODAY]
+            self.attrs[ATTR_RAW_TOMORROW] = data[ATTR_RAW_TOMORROW]
+            # Like raw_today and raw_tomorrow, with each interval flagged as an estimate.
+            self.attrs[ATTR_FORECAST] = data[ATTR_FORECAST]
+        self._update_statistics(data)
+        self.attrs[ATTR_TOMORROW_VALID] = data[ATTR_TOMORROW_VALID]
+        self.attrs[ATTR_TRANS_NETTARIF] = tariffs.get("transmissions_nettarif", 0)
+        self.attrs[ATTR_SYSTEMTARIF] = tariffs.get("systemtarif", 0)
+        self.attrs[ATTR_ELAFGIFT] = tariffs.get("elafgift", 0)
+        self.attrs[ATTR_LAST_UPDATED] = data[ATTR_LAST_UPDATED]
+
+    def _update_statistics(self, data: dict[str, Any]) -> None:
+        """Set the price statistics attributes, calculated by the coordinator with the prices."""
+        today = data[DATA_STATISTICS][ATTR_TODAY]
+        tomorrow = data[DATA_STATISTICS][ATTR_TOMORROW]
+        self.attrs[ATTR_AVERAGE] = today.mean if today else None
+        self.attrs[ATTR_MIN] = today.min if today else None
+        self.attrs[ATTR_MAX] = today.max if today else None
+        self.attrs[ATTR_PERCENTILES] = today.as_dict()[ATTR_PERCENTILES] if today else None
+        self.attrs[ATTR_TOMORROW_STATISTICS] = tomorrow.as_dict() if tomorrow else None
+        # Rank of each interval within its day, 0 for the cheapest, aligned with the price lists.
+        rank_today = today.ranks if today else []
+        rank_tomorrow = tomorrow.ranks if tomorrow else []
+        if self.config.get(CONF_ATTRIBUTE_FORMAT) == ATTRIBUTE_FORMAT_COMPACT:
+            self.attrs[ATTR_RANKS] = rank_today + rank_tomorrow
+        else:
+            self.attrs[ATTR_RANK_TODAY] = rank_today
+            self.attrs[ATTR_RANK_TOMORROW] = rank_tomorrow
+
+
+class UnrecordedPriceSensor(PriceSensor):
+    """Price sensor that keeps the large price attributes out of the recorder."""
+
+    _unrecorded_attributes = frozenset(
+        {
+            ATTR_TODAY,
+            ATTR_TOMORROW,
+            ATTR_RAW_TODAY,
+            ATTR_RAW_TOMORROW,
+            ATTR_PRICES,
+            ATTR_RANK_TODAY,
+            ATTR_RANK_TOMORROW,
+            ATTR_RANKS,
+            ATTR_FORECAST,
+        }
+    )
+
+
+class CheapestWindowSensor(CoordinatorEntity[ElectricityPriceCoordinator], SensorEntity):
+    """Start of the cheapest window of a fixed length in the remaining published prices."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_icon = "mdi:clock-start"
 
-            # Schedule the debounced update
-            await self._debouncer.async_call()
+    def __init__(self, coordinator: ElectricityPriceCoordinator, unique_id: str, hours: float):
+        super().__init__(coordinator)
+        self._hours = hours
+        self._attr_name = f"{NAME} cheapest {hours:g} hour window"
+        self._attr_unique_id = f"{unique_id}_{CONF_CHEAPEST_WINDOW}"
+        self._attr_extra_state_attributes = {}
 
-        # Track state changes for the Nordpool sensor
+    async def async_added_to_hass(self) -> None:
+        """Run when the entity is added to Home Assistant."""
+        await super().async_added_to_hass()
+        self._update_window()
+        # Intervals that have passed drop out of the search at each 15-minute boundary.
         self.async_on_remove(
-            async_track_state_change(self.hass, self.config[CONF_PRICE_SENSOR], async_update_callback)
+            async_track_utc_time_change(
+                self.hass, self._async_interval_tick, minute=INTERVAL_MINUTES, second=0
+            )
         )
 
-    async def async_update(self) -> None:
-        """Updates the sensor asynchronously."""
-        try:
-            tariffs = await self.fetch_tariffs()  # Fetch tariffs via Eloverblik
-            total_prices = await self.calculate_total(tariffs)
-
-            # Initialize dictionary to hold prices with timestamps
-            total_prices_with_times = {}
-
-            # Add start and end timestamps to total_prices
-            total_prices_with_times[ATTR_TODAY] = self.add_time_stamps(total_prices[ATTR_TODAY], "today")
-            total_prices_with_times[ATTR_TOMORROW] = self.add_time_stamps(total_prices[ATTR_TOMORROW], "tomorrow")
-
-            # Get the current time and set the state based on the current interval
-            now = dt_util.now().astimezone()
-
-            matched = False
-            for entry in total_prices_with_times[ATTR_TODAY]:
-                start = datetime.fromisoformat(entry["start"])
-                end = datetime.fromisoformat(entry["end"])
-                if start <= now < end:
-                    self._state = entry["value"]
-                    matched = True
-                    break
-
-            if not matched:
-                _LOGGER.warning("No matching interval found for now=%s", now)
-                self._state = None
-
-            # Determine whether tomorrows prices are available.
-            tomorrow_valid = bool(total_prices[ATTR_TOMORROW])  # True if not empty, False otherwise
-
-            # Get region from the price sensor
-            price_sensor_state = self.hass.states.get(self.config[CONF_PRICE_SENSOR])
-            region = price_sensor_state.attributes.get("region", "DK2") if price_sensor_state else "DK2"
-
-            # Populate attributes
-            self.attrs[ATTR_STATE_CLASS] = "total"
-            self.attrs[ATTR_UNIT] = "kWh"
-            self.attrs[ATTR_CURRENCY] = CURRENCY
-            self.attrs[ATTR_COUNTRY] = COUNTRY
-            self.attrs[ATTR_REGION] = region
-            self.attrs[ATTR_TODAY] = total_prices[ATTR_TODAY]
-            self.attrs[ATTR_TOMORROW] = total_prices[ATTR_TOMORROW]
-            self.attrs[ATTR_TOMORROW_VALID] = tomorrow_valid
-            self.attrs[ATTR_RAW_TODAY] = total_prices_with_times[ATTR_TODAY]
-            self.attrs[ATTR_RAW_TOMORROW] = total_prices_with_times[ATTR_TOMORROW]
-            self.attrs[ATTR_TRANS_NETTARIF] = tariffs.get("transmissions_nettarif", 0)
-            self.attrs[ATTR_SYSTEMTARIF] = tariffs.get("systemtarif", 0)
-            self.attrs[ATTR_ELAFGIFT] = tariffs.get("elafgift", 0)
-            self.attrs[ATTR_LAST_UPDATED] = datetime.now().isoformat()
-
-            self._available = True
-
-        except Exception as e:
-            _LOGGER.error("Unexpected error in async_update: %s", e)
-            self._available = False
-
-    def add_time_stamps(self, prices: list, day: str) -> list:
-        """Attach timestamps to hourly prices with time zone awareness."""
-        # Get Home Assistant's configured time zone
-        tz = timezone(self.hass.config.time_zone)
-
-        base_date = datetime.now(tz)
-        if day == "tomorrow":
-            base_date += timedelta(days=1)
-
-        return [
-            {
-                "start": (base_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(minutes=15 * i)).isoformat(),
-                "end": (base_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(minutes=15 * (i + 1))).isoformat(),
-                "value": price,
-            }
-            for i, price in enumerate(prices)
-        ]
-
-    async def fetch_tariffs(self) -> dict:
-        """Fetch tariffs from Eloverblik."""
-        try:
-            client = Eloverblik(self.config.get(CONF_ELOVERBLIK_TOKEN))
-            tariffs = await self.hass.async_add_executor_job(client.get_tariffs, self.config.get(CONF_METERING_POINT))
-            return tariffs.charges  # Extract charges dictionary
-        except Exception as e:
-            _LOGGER.error("Failed to fetch tariffs: %s", e)
-            return {}  # Return an empty dict to avoid crashing
-
-    async def wait_for_sensor(self, sensor_id, timeout=30):
-        """Wait for a sensor to become available."""
-        for _ in range(timeout):
-            state = self.hass.states.get(sensor_id)
-            if state:
-                return state
-            _LOGGER.warning("Waiting for sensor '%s' to become available", sensor_id)
-            await asyncio.sleep(1)
-        _LOGGER.error("Sensor '%s' did not become available within %s seconds", sensor_id, timeout)
-        return None
-
-    async def calculate_total(self, tariffs):
-        """Calculate the total electricity prices, including fees and VAT."""
-        sensor_id = self.config.get(CONF_PRICE_SENSOR)
-        price_sensor_state = await self.wait_for_sensor(sensor_id)
-
-        # Extract raw Nordpool prices (15‑min data)
-        raw_today_prices = price_sensor_state.attributes.get("today", [])
-        raw_tomorrow_prices = price_sensor_state.attributes.get("tomorrow", [])
-
-        # If these are nested dicts like [{'time': '...', 'value': 0.123}], flatten them
-        if raw_today_prices and isinstance(raw_today_prices[0], dict):
-            raw_today_prices = [p["value"] for p in raw_today_prices]
-        if raw_tomorrow_prices and isinstance(raw_tomorrow_prices[0], dict):
-            raw_tomorrow_prices = [p["value"] for p in raw_tomorrow_prices]
-
-        if price_sensor_state is None:
-            _LOGGER.error("Failed to fetch sensor '%s'. Skipping calculation.", sensor_id)
-            return {"today": [0] * 24, "tomorrow": [0] * 24}
-
-        # Extract raw prices from the Nordpool sensor
-        if len(raw_today_prices) not in (96, 100):
-            _LOGGER.warning("Unexpected number of raw_today_prices: %d (expected 96 or 100)", len(raw_today_prices))
-        if len(raw_tomorrow_prices) not in (0, 96, 100):
-            _LOGGER.warning("Unexpected number of raw_tomorrow_prices: %d (expected 0, 96 or 100)", len(raw_tomorrow_prices))
-
-        # Fixed fees
-        transmission_fee = tariffs.get("transmissions_nettarif", 0)
-        system_tariff = tariffs.get("systemtarif", 0)
-        electricity_tax = tariffs.get("elafgift", 0)
-
-        # Variable fees (hourly)
-        nettarif_c = tariffs.get("nettarif_c", [0] * 24)
-
-        # Expand nettarif_c to match the total number of intervals
-        total_intervals = len(raw_today_prices) + len(raw_tomorrow_prices)
-        if len(nettarif_c) == 24:
-            nettarif_c = [val for val in nettarif_c for _ in range(4)]
-        if len(nettarif_c) < total_intervals:
-            _LOGGER.warning("Padding nettarif_c from %d to %d intervals", len(nettarif_c), total_intervals)
-            nettarif_c.extend([0] * (total_intervals - len(nettarif_c)))
-        elif len(nettarif_c) > total_intervals:
-            _LOGGER.warning("Truncating nettarif_c from %d to %d intervals", len(nettarif_c), total_intervals)
-            nettarif_c = nettarif_c[:total_intervals]
-
-        # Log lenght of prices
-        _LOGGER.warning("raw_today=%d raw_tomorrow=%d nettarif=%d",
-                len(raw_today_prices), len(raw_tomorrow_prices), len(nettarif_c))
-
-        # Calculate total prices with fees and VAT
-        total_today = []
-        for i, p in enumerate(raw_today_prices):
-            if i >= len(nettarif_c):
-                _LOGGER.error("Index %d out of range for nettarif_c (len=%d)", i, len(nettarif_c))
-                break
-            total_today.append(round(p + transmission_fee + system_tariff + electricity_tax + nettarif_c[i], 3))
-
-        total_tomorrow = []
-        for i, p in enumerate(raw_tomorrow_prices):
-            index = i + len(total_today)
-            if index >= len(nettarif_c):
-                _LOGGER.error("Index %d out of range for nettarif_c (len=%d)", index, len(nettarif_c))
-                break
-            total_tomorrow.append(round(p + transmission_fee + system_tariff + electricity_tax + nettarif_c[index], 3))
-
-        # Add VAT (25%)
-        total_today = [round(price * 1.25, 3) for price in total_today]
-        total_tomorrow = [round(price * 1.25, 3) for price in total_tomorrow]
-
-        return {
-            ATTR_TODAY: total_today,
-            ATTR_TOMORROW: total_tomorrow,
-            "total_fees": {
-                "fixed": round(transmission_fee + system_tariff + electricity_tax, 3),
-                "variable": nettarif_c,
-            },
+    @core.callback
+    def _async_interval_tick(self, now: datetime) -> None:
+        previous = self._attr_native_value
+        self._update_window()
+        if self._attr_native_value != previous:
+            self.async_write_ha_state()
+
+    @core.callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated prices from the coordinator."""
+        self._update_window()
+        super()._handle_coordinator_update()
+
+    def _update_window(self) -> None:
+        """Find the cheapest window from the current interval on in the interval index."""
+        self._attr_native_value = None
+        self._attr_extra_state_attributes = {}
+        if self.coordinator.data is None:
+            return
+        index = self.coordinator.data[DATA_INTERVAL_INDEX]
+        slots = math.ceil(self._hours * 3600 / index.slot_seconds)
+        current = index.index_at(dt_util.utcnow().timestamp())
+        if current is None or (window := cheapest_window(index.prices, slots, current)) is None:
+            return
+        start = index.starts[window.start]
+        self._attr_native_value = dt_util.utc_from_timestamp(start)
+        self._attr_extra_state_attributes = {
+            ATTR_END: dt_util.as_local(dt_util.utc_from_timestamp(start + slots * index.slot_seconds)).isoformat(),
+            ATTR_AVERAGE: round(window.total / slots, 3),
         }
+
+
+class ConsumptionCostSensor(CoordinatorEntity[ConsumptionCostCoordinator], SensorEntity):
+    """Cost of the consumption of the metering point on its last day with meter data, or this month so far."""
+
+    entity_description: CostSensorEntityDescription
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+
+    def __init__(
+            self,
+            coordinator: ConsumptionCostCoordinator,
+            unique_id: str,
+            description: CostSensorEntityDescription,
+    ):
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_name = f"{NAME} {description.name}"
+        self._attr_unique_id = f"{unique_id}_{description.key}"
+
+    @property
+    def native_unit_of_measurement(self) -> str:
+        return self.coordinator.data[ATTR_CURRENCY] if self.coordinator.data else CURRENCY
+
+    @property
+    def native_value(self) -> StateType:
+        return self.entity_description.value_fn(self.coordinator.data) if self.coordinator.data else None
+
+    @property
+    def last_reset(self) -> datetime | None:
+        return self.entity_description.last_reset_fn(self.coordinator.data) if self.coordinator.data else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self.entity_description.attributes_fn(self.coordinator.data) if self.coordinator.data else {}
+
+
+class DiagnosticSensor(SensorEntity):
+    """Polled sensor exposing the timing and counters of the update path."""
+
+    entity_description: DiagnosticSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    # Disabled by default, so the diagnostics add no database rows unless wanted.
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+            self,
+            coordinator: ElectricityPriceCoordinator,
+            unique_id: str,
+            description: DiagnosticSensorEntityDescription,
+    ):
+        self.coordinator = coordinator
+        self.entity_description = description
+        self._attr_name = f"{NAME} {description.name}"
+        self._attr_unique_id = f"{unique_id}_{description.key}"
+
+    async def async_update(self) -> None:
+        """Read the current value from the instrumentation."""
+        self._attr_native_value = self.entity_description.value_fn(self.coordinator)
@@ -0,0 +1,199 @@
+"""
+Services planning consumption around the calculated prices
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+import math
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant import core
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .backtest import TariffVersion, run_backtest
+from .const import (
+    ATTR_END,
+    ATTR_START,
+    CONF_PRICE_SENSOR,
+    DATA_COORDINATOR,
+    DATA_COORDINATORS,
+    DOMAIN,
+    SERVICE_BACKTEST,
+    SERVICE_FIND_CHEAPEST_WINDOW,
+)
+from .coordinator import DATA_INTERVAL_INDEX, ElectricityPriceCoordinator
+from .interval_index import IntervalIndex
+from .planning import cheapest_slots, cheapest_window, slot_range
+from .price_formula import FIXED_CHARGES
+from .tariff_cache import TariffFetchError
+
+ATTR_DURATION = "duration"
+ATTR_TARIFFS = "tariffs"
+ATTR_VALID_FROM = "valid_from"
+ATTR_NETTARIF_C = "nettarif_c"
+
+
+def _network_tariff(value: list[float]) -> list[float]:
+    """Validate a network tariff of 24 hourly or 96 quarter-hourly prices."""
+    if len(value) not in (24, 96):
+        raise vol.Invalid(f"{ATTR_NETTARIF_C} must have 24 or 96 prices, not {len(value)}")
+    return value
+
+
+# Tariffs in the format of the Eloverblik charges, in effect from a date on.
+TARIFF_VERSION_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_VALID_FROM): cv.date,
+        **{vol.Optional(name): vol.Coerce(float) for name in FIXED_CHARGES},
+        vol.Optional(ATTR_NETTARIF_C): vol.All([vol.Coerce(float)], _network_tariff),
+    }
+)
+
+FIND_CHEAPEST_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_DURATION): vol.All(cv.time_period, cv.positive_timedelta),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+BACKTEST_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.date,
+        vol.Optional(ATTR_END): cv.date,
+        vol.Optional(ATTR_TARIFFS): vol.All(cv.ensure_list, [TARIFF_VERSION_SCHEMA]),
+    }
+)
+
+
+def _as_timestamp(value: datetime) -> float:
+    """Return the epoch timestamp of a datetime, taking naive datetimes as local time."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return value.timestamp()
+
+
+def _local_isoformat(timestamp: float) -> str:
+    return dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).isoformat()
+
+
+def _interval(index: IntervalIndex, i: int) -> dict[str, Any]:
+    """Return an interval in the layout of the raw_today and raw_tomorrow attributes."""
+    start = index.starts[i]
+    return {
+        "start": _local_isoformat(start),
+        "end": _local_isoformat(start + index.slot_seconds),
+        "value": index.prices[i],
+    }
+
+
+@core.callback
+def _get_coordinator(hass: core.HomeAssistant, entry_id: str | None) -> ElectricityPriceCoordinator:
+    """Return the coordinator of a config entry, or the only coordinator if no entry is given."""
+    domain_data = hass.data.get(DOMAIN, {})
+    if entry_id is not None:
+        if entry_id not in domain_data:
+            raise ServiceValidationError(f"No electricity price config entry {entry_id}")
+        return domain_data[entry_id][DATA_COORDINATOR]
+    coordinators = list(domain_data.get(DATA_COORDINATORS, {}).values())
+    if len(coordinators) != 1:
+        raise ServiceValidationError(
+            f"{ATTR_CONFIG_ENTRY_ID} is required with {len(coordinators)} electricity price sensors"
+        )
+    return coordinators[0]
+
+
+def find_cheapest_window(
+        index: IntervalIndex, slots: int, start: float, end: float | None = None
+) -> dict[str, Any]:
+    """Return the cheapest window of consecutive intervals and the cheapest intervals
+    overall between two epoch timestamps.
+
+    Both are found in the calculated price index, so planning adds no price lookups
+    or calculations.
+    """
+    first, last = slot_range(index, start, end)
+    window = cheapest_window(index.prices, slots, first, last)
+    cheapest = cheapest_slots(index.prices, slots, first, last)
+    return {
+        "window": {
+            "start": _local_isoformat(index.starts[window.start]),
+            "end": _local_isoformat(index.starts[window.start + slots - 1] + index.slot_seconds),
+            "average": round(window.total / slots, 3),
+            "prices": index.prices[window.start:window.start + slots],
+        } if window else None,
+        "cheapest_slots": [_interval(index, i) for i in cheapest],
+        "cheapest_slots_average": round(
+            sum(index.prices[i] for i in cheapest) / slots, 3
+        ) if cheapest else None,
+    }
+
+
+@core.callback
+def async_setup_services(hass: core.HomeAssistant) -> None:
+    """Register the electricity price services."""
+
+    @core.callback
+    def async_find_cheapest_window(call: core.ServiceCall) -> core.ServiceResponse:
+        """Find the cheapest time to run something for a duration before a deadline."""
+        coordinator = _get_coordinator(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        if coordinator.data is None:
+            raise ServiceValidationError("No electricity prices calculated yet")
+        index = coordinator.data[DATA_INTERVAL_INDEX]
+        slots = math.ceil(call.data[ATTR_DURATION].total_seconds() / index.slot_seconds)
+        start = _as_timestamp(call.data[ATTR_START]) if ATTR_START in call.data else dt_util.utcnow().timestamp()
+        end = _as_timestamp(call.data[ATTR_END]) if ATTR_END in call.data else None
+        return find_cheapest_window(index, slots, start, end)
+
+    async def async_backtest(call: core.ServiceCall) -> core.ServiceResponse:
+        """Reprice the recorded spot prices of a period under the current or given tariffs."""
+        coordinator = _get_coordinator(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        if "recorder" not in hass.config.components:
+            raise ServiceValidationError("Backtesting needs the recorded price sensor history")
+        from homeassistant.components.recorder import get_instance
+
+        start: date = call.data[ATTR_START]
+        end: date = call.data.get(ATTR_END, dt_util.now().date())
+        if ATTR_TARIFFS in call.data:
+            versions = [
+                TariffVersion(tariffs[ATTR_VALID_FROM], {k: v for k, v in tariffs.items() if k != ATTR_VALID_FROM})
+                for tariffs in call.data[ATTR_TARIFFS]
+            ]
+        else:
+            try:
+                versions = [TariffVersion(date.min, await coordinator.fetch_tariffs())]
+            except TariffFetchError as e:
+                raise HomeAssistantError(str(e)) from e
+
+        result = await get_instance(hass).async_add_executor_job(
+            run_backtest,
+            hass,
+            coordinator.config[CONF_PRICE_SENSOR],
+            start,
+            end + timedelta(days=1),
+            versions,
+            coordinator.formula,
+        )
+        return {ATTR_START: start.isoformat(), ATTR_END: end.isoformat(), **result}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKTEST,
+        async_backtest,
+        schema=BACKTEST_SCHEMA,
+        supports_response=core.SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        async_find_cheapest_window,
+        schema=FIND_CHEAPEST_WINDOW_SCHEMA,
+        supports_response=core.SupportsResponse.ONLY,
+    )
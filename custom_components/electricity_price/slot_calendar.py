@@ -0,0 +1,104 @@
+"""
+Cached calendar of the price intervals of each local day
+"""
+from __future__ import annotations
+
+from array import array
+from datetime import date, datetime, time, timedelta, tzinfo
+from functools import lru_cache
+from typing import Any, Sequence
+
+from homeassistant.util import dt as dt_util
+
+from .interval_index import SLOT_SECONDS
+
+# Local days kept per time zone: yesterday, today and tomorrow of a few
+# updates, plus the days a backfill or forecast walks through.
+CACHED_DAYS = 16
+
+
+class DaySlots:
+    """Boundaries of the intervals of one local day, 92, 96 or 100 for 15-minute intervals.
+
+    Built once per day from the time zone rules, so the start, end and
+    timestamps of any interval are lookups instead of datetime arithmetic.
+    """
+
+    __slots__ = ("day", "start_time", "start", "end", "slot_seconds", "boundaries", "labels")
+
+    def __init__(self, day: date, tz: tzinfo, slot_seconds: int = SLOT_SECONDS):
+        self.day = day
+        self.start_time = datetime.combine(day, time(), tz)
+        self.start = self.start_time.timestamp()
+        self.end = datetime.combine(day + timedelta(days=1), time(), tz).timestamp()
+        self.slot_seconds = slot_seconds
+        # Epoch seconds of the start of each interval and the end of the last.
+        self.boundaries = array("d", range(int(self.start), int(self.end) + 1, slot_seconds))
+        # Local ISO timestamps of the boundaries, with the UTC offset in effect at each.
+        self.labels = tuple(datetime.fromtimestamp(boundary, tz).isoformat() for boundary in self.boundaries)
+
+    def __len__(self) -> int:
+        return len(self.boundaries) - 1
+
+    def index_at(self, timestamp: float) -> int | None:
+        """Return the index of the interval containing the epoch timestamp, if it is within the day."""
+        if not self.start <= timestamp < self.end:
+            return None
+        return int((timestamp - self.start) // self.slot_seconds)
+
+    def label(self, i: int) -> str:
+        """Return the local ISO timestamp of boundary i, also past the end of the day."""
+        if i < len(self.labels):
+            return self.labels[i]
+        tz = self.start_time.tzinfo
+        return datetime.fromtimestamp(self.start + i * self.slot_seconds, tz).isoformat()
+
+    def time_stamps(self, prices: Sequence[float], **extra: Any) -> list[dict[str, Any]]:
+        """Return the start, end and price of each interval, in the Nordpool attribute format."""
+        if len(prices) > len(self):
+            labels = [self.label(i) for i in range(len(prices) + 1)]
+        else:
+            labels = self.labels
+        return [
+            {"start": labels[i], "end": labels[i + 1], "value": price, **extra}
+            for i, price in enumerate(prices)
+        ]
+
+
+@lru_cache(maxsize=CACHED_DAYS)
+def _day_slots(day: date, time_zone: str, slot_seconds: int) -> DaySlots:
+    return DaySlots(day, dt_util.get_time_zone(time_zone), slot_seconds)
+
+
+class SlotCalendar:
+    """Local days and their intervals in one time zone.
+
+    The tables of recently used days are kept, evicting the least recently used,
+    and the current day is kept until it ends, so finding today at each update
+    is a comparison and the day rolls over when its last interval ends.
+    """
+
+    def __init__(self, time_zone: str, slot_seconds: int = SLOT_SECONDS):
+        self.time_zone = time_zone
+        self.tz = dt_util.get_time_zone(time_zone)
+        self.slot_seconds = slot_seconds
+        self._current: DaySlots | None = None
+
+    def day(self, day: date) -> DaySlots:
+        """Return the intervals of a local day."""
+        return _day_slots(day, self.time_zone, self.slot_seconds)
+
+    def today(self, timestamp: float | None = None) -> DaySlots:
+        """Return the intervals of the local day containing the epoch timestamp, by default now."""
+        if timestamp is None:
+            timestamp = dt_util.utcnow().timestamp()
+        current = self._current
+        if current is None or not current.start <= timestamp < current.end:
+            current = self._current = self.day(datetime.fromtimestamp(timestamp, self.tz).date())
+        return current
+
+
+@lru_cache(maxsize=4)
+def get_slot_calendar(time_zone: str) -> SlotCalendar:
+    """Return the calendar of a time zone, shared by all config entries."""
+    return SlotCalendar(time_zone)
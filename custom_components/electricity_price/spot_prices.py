@@ -0,0 +1,103 @@
+"""
+Shared ingestion of spot prices from price sensors
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+from homeassistant import core
+
+from .const import (
+    ATTR_COUNTRY,
+    ATTR_CURRENCY,
+    ATTR_REGION,
+    ATTR_TODAY,
+    ATTR_TOMORROW,
+    ATTR_UNIT,
+    DATA_SPOT_SOURCES,
+    DOMAIN,
+    EXCHANGE_RATES,
+    TARIFF_CURRENCY,
+)
+
+# Divisors to prices per kWh in the main currency unit.
+UNIT_DIVISORS = {"kWh": 1, "MWh": 1000, "Wh": 0.001}
+
+
+def raw_prices(attributes: Mapping[str, Any], day: str) -> list[float]:
+    """Return the spot prices of "today" or "tomorrow" from Nordpool sensor attributes."""
+    prices = attributes.get(day) or []
+    # If these are nested dicts like [{'time': '...', 'value': 0.123}], flatten them
+    if prices and isinstance(prices[0], dict):
+        prices = [p["value"] for p in prices]
+    return prices
+
+
+@dataclass(frozen=True)
+class SpotSeries:
+    """Spot prices of a price area per kWh in the main currency unit, for today and tomorrow."""
+
+    region: str | None
+    currency: str | None
+    country: str | None
+    today: tuple[float, ...]
+    tomorrow: tuple[float, ...]
+
+    @classmethod
+    def from_attributes(cls, attributes: Mapping[str, Any]) -> SpotSeries:
+        """Normalize the attributes of a Nordpool sensor.
+
+        Prices in cents (øre) or per MWh are converted to the main currency unit
+        per kWh, and prices in a currency with a known exchange rate to the
+        currency of the tariffs.
+        """
+        divisor = UNIT_DIVISORS.get(attributes.get(ATTR_UNIT, "kWh"), 1)
+        if attributes.get("price_in_cents"):
+            divisor *= 100
+        currency = attributes.get(ATTR_CURRENCY)
+        rate = EXCHANGE_RATES.get(currency, 1)
+        if currency in EXCHANGE_RATES:
+            currency = TARIFF_CURRENCY
+        today = raw_prices(attributes, ATTR_TODAY)
+        tomorrow = raw_prices(attributes, ATTR_TOMORROW)
+        if divisor != 1 or rate != 1:
+            today = [price * rate / divisor for price in today]
+            tomorrow = [price * rate / divisor for price in tomorrow]
+        return cls(
+            region=attributes.get(ATTR_REGION),
+            currency=currency,
+            country=attributes.get(ATTR_COUNTRY),
+            today=tuple(today),
+            tomorrow=tuple(tomorrow),
+        )
+
+
+class SpotPriceSource:
+    """Normalized spot prices of one price sensor, shared by every coordinator using it.
+
+    Each state of the sensor is normalized once, however many metering points
+    are priced from it.
+    """
+
+    def __init__(self, entity_id: str):
+        self.entity_id = entity_id
+        self._state: core.State | None = None
+        self._series: SpotSeries | None = None
+
+    @core.callback
+    def series(self, state: core.State) -> SpotSeries:
+        """Return the normalized prices of a state of the sensor."""
+        if state is not self._state:
+            self._series = SpotSeries.from_attributes(state.attributes)
+            self._state = state
+        return self._series
+
+
+@core.callback
+def get_spot_source(hass: core.HomeAssistant, entity_id: str) -> SpotPriceSource:
+    """Return the spot price source of a price sensor, shared by all config entries."""
+    sources = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_SPOT_SOURCES, {})
+    if entity_id not in sources:
+        sources[entity_id] = SpotPriceSource(entity_id)
+    return sources[entity_id]
@@ -0,0 +1,155 @@
+"""
+Persistent cache for tariffs fetched from Eloverblik
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from homeassistant import core
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import get_client
+from .const import DOMAIN, DATA_TARIFF_CACHE, DEFAULT_TARIFF_TTL
+from .instrumentation import (
+    COUNTER_API_CALLS,
+    COUNTER_API_FAILURES,
+    COUNTER_STALE_TARIFFS_SERVED,
+    COUNTER_TARIFF_CACHE_HITS,
+    Instrumentation,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.tariffs"
+SAVE_DELAY = 10  # seconds
+
+
+def tariff_version(charges: dict[str, Any]) -> str:
+    """Return a short content hash identifying a set of tariffs."""
+    return hashlib.sha1(json.dumps(charges, sort_keys=True).encode()).hexdigest()[:12]
+
+
+class TariffFetchError(Exception):
+    """Raised when no tariffs could be fetched and none are cached."""
+
+
+class TariffCache:
+    """Tariffs per metering point, kept for a TTL and persisted across restarts.
+
+    When a refresh fails the last known good tariffs keep being served, so a
+    flaky API never turns into silently zeroed fees.
+    """
+
+    def __init__(self, hass: core.HomeAssistant):
+        self.hass = hass
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self.metrics = Instrumentation()
+        # Metering points in use, per token, so their tariffs are fetched together.
+        self._metering_points: dict[str, Counter[str]] = {}
+
+    async def _async_load(self) -> None:
+        """Load persisted tariffs on first use."""
+        if self._loaded:
+            return
+        data = await self._store.async_load()
+        if data:
+            self._entries = data.get("entries", {})
+            for entry in self._entries.values():
+                entry.setdefault("version", tariff_version(entry["charges"]))
+        self._loaded = True
+
+    @core.callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"entries": self._entries}
+
+    async def async_get(
+            self,
+            token: str,
+            metering_point: str,
+            ttl: timedelta = timedelta(hours=DEFAULT_TARIFF_TTL),
+    ) -> dict[str, Any]:
+        """Return tariffs for a metering point, refreshing them once the TTL has passed."""
+        async with self._lock:
+            await self._async_load()
+            entry = self._entries.get(metering_point)
+            now = dt_util.utcnow()
+            if entry and now - dt_util.parse_datetime(entry["fetched"]) < ttl:
+                self.metrics.increment(COUNTER_TARIFF_CACHE_HITS)
+                return entry["charges"]
+
+            # Refresh every metering point using the token in the same request, so the
+            # other entries find their tariffs cached in this refresh cycle.
+            metering_points = sorted(set(self._metering_points.get(token, ())) | {metering_point})
+            self.metrics.increment(COUNTER_API_CALLS)
+            try:
+                fetched = await self._async_fetch(token, metering_points)
+                fetched = {point: charges for point, charges in fetched.items() if charges}
+                for point, charges in fetched.items():
+                    self._set(point, charges, now)
+                if metering_point not in fetched:
+                    raise ValueError("No tariffs in the API response")
+            except Exception as e:
+                self.metrics.increment(COUNTER_API_FAILURES)
+                if entry:
+                    self.metrics.increment(COUNTER_STALE_TARIFFS_SERVED)
+                    _LOGGER.warning(
+                        "Failed to refresh tariffs for %s, using tariffs from %s: %s",
+                        metering_point, entry["fetched"], e,
+                    )
+                    return entry["charges"]
+                raise TariffFetchError(f"Failed to fetch tariffs for {metering_point}: {e}") from e
+
+            return fetched[metering_point]
+
+    @core.callback
+    def async_register(self, token: str, metering_point: str) -> Callable[[], None]:
+        """Register a metering point to be included in batched tariff fetches for its token."""
+        self._metering_points.setdefault(token, Counter())[metering_point] += 1
+
+        @core.callback
+        def unregister() -> None:
+            self._metering_points[token][metering_point] -= 1
+            if self._metering_points[token][metering_point] <= 0:
+                del self._metering_points[token][metering_point]
+
+        return unregister
+
+    @core.callback
+    def _set(self, metering_point: str, charges: dict[str, Any], fetched: datetime) -> None:
+        """Cache freshly fetched tariffs."""
+        self._entries[metering_point] = {
+            "fetched": fetched.isoformat(),
+            "charges": charges,
+            "version": tariff_version(charges),
+        }
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @core.callback
+    def version(self, metering_point: str) -> str | None:
+        """Return the version of the cached tariffs, which changes only when their content does."""
+        entry = self._entries.get(metering_point)
+        return entry["version"] if entry else None
+
+    async def _async_fetch(self, token: str, metering_points: list[str]) -> dict[str, dict[str, Any]]:
+        """Fetch tariffs for metering points from Eloverblik in one request."""
+        return await get_client(self.hass, token).async_get_tariffs_batch(metering_points)
+
+
+@core.callback
+def get_tariff_cache(hass: core.HomeAssistant) -> TariffCache:
+    """Return the tariff cache shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_TARIFF_CACHE not in domain_data:
+        domain_data[DATA_TARIFF_CACHE] = TariffCache(hass)
+    return domain_data[DATA_TARIFF_CACHE]
@@ -0,0 +1,100 @@
+"""
+Network tariff schedule mapping local intervals to their tariff
+"""
+from __future__ import annotations
+
+from array import array
+from datetime import date, datetime, time
+from functools import lru_cache
+import logging
+from typing import Any, Sequence
+
+from homeassistant.util import dt as dt_util
+
+from .pricing import align_variable_fees
+
+_LOGGER = logging.getLogger(__name__)
+
+SEASON_SUMMER = "summer"
+SEASON_WINTER = "winter"
+DAY_TYPE_WEEKDAY = "weekday"
+DAY_TYPE_WEEKEND = "weekend"
+
+SUMMER_MONTHS = range(4, 10)  # April through September
+MINUTES_PER_DAY = 24 * 60
+
+
+def season(day: date) -> str:
+    """Return the tariff season of a date."""
+    return SEASON_SUMMER if day.month in SUMMER_MONTHS else SEASON_WINTER
+
+
+def day_type(day: date) -> str:
+    """Return the tariff day type of a date."""
+    return DAY_TYPE_WEEKEND if day.weekday() >= 5 else DAY_TYPE_WEEKDAY
+
+
+@lru_cache(maxsize=32)
+def profile_positions(
+        day: date, time_zone: str, intervals: int, slot_minutes: int, resolution: int
+) -> tuple[int, ...]:
+    """Return the profile position of each interval of a local day.
+
+    A profile has ``resolution`` values covering the local wall-clock day, e.g.
+    24 hourly or 96 quarter-hourly values. On the 23 hour DST day the skipped hour
+    has no intervals, and on the 25 hour day the repeated hour maps to the same
+    positions twice.
+    """
+    tz = dt_util.get_time_zone(time_zone)
+    start = datetime.combine(day, time(), tz).timestamp()
+    positions = []
+    for i in range(intervals):
+        local = datetime.fromtimestamp(start + i * slot_minutes * 60, tz)
+        positions.append(min((local.hour * 60 + local.minute) * resolution // MINUTES_PER_DAY, resolution - 1))
+    return tuple(positions)
+
+
+class TariffSchedule:
+    """Network tariff (nettarif C) per local interval, for each season and day type.
+
+    Built once per tariff version. Expanding a day to its 92, 96 or 100 intervals
+    is then a gather of precomputed profile positions.
+    """
+
+    def __init__(
+            self,
+            default: Sequence[float],
+            profiles: dict[tuple[str, str], Sequence[float]] | None = None,
+    ):
+        self.default = array("d", default)
+        self.profiles = {key: array("d", values) for key, values in (profiles or {}).items()}
+        # Tariffs not covering a whole day in a multiple of 24 values are applied
+        # from the first interval of each day, padded with zeros.
+        self.sequential = len(self.default) == 0 or len(self.default) % 24 != 0
+
+    @classmethod
+    def from_charges(cls, charges: dict[str, Any]) -> TariffSchedule:
+        """Build a schedule from Eloverblik charges.
+
+        Eloverblik only returns the tariff currently in effect, which is used for
+        every season and day type.
+        """
+        nettarif_c = charges.get("nettarif_c", [0] * 24)
+        if not isinstance(nettarif_c, list):
+            nettarif_c = [nettarif_c] * 24
+        return cls(nettarif_c)
+
+    def profile(self, day: date) -> array:
+        """Return the tariff profile in effect on a date."""
+        return self.profiles.get((season(day), day_type(day)), self.default)
+
+    def expand(self, day: date, time_zone: str, intervals: int) -> array:
+        """Return the network tariff for each interval of a local day."""
+        profile = self.profile(day)
+        if self.sequential:
+            _LOGGER.debug("Applying %d network tariffs to %d intervals in order", len(profile), intervals)
+            return align_variable_fees(profile, intervals)
+        # Hourly spot prices on a 23, 24 or 25 hour day, otherwise 15-minute intervals.
+        slot_minutes = 60 if intervals in (23, 24, 25) else 15
+        positions = profile_positions(day, time_zone, intervals, slot_minutes, len(profile))
+        return array("d", [profile[i] for i in positions])
@@ -17,3 +17,19 @@ def percentage_validation(value: Any) -> float:
         return float(value)
     except ValueError:
         raise vol.Invalid('You should input a number in percentage, e.g. "25" for 25 %.')
+
+
+def hour_ranges_validation(value: Any) -> list:
+    """Parse hour ranges like "0-6,21-24" into a list of (start, end) tuples."""
+    ranges = []
+    try:
+        for part in str(value).replace(" ", "").split(","):
+            if not part:
+                continue
+            start, end = (int(hour) for hour in part.split("-"))
+            if not 0 <= start < end <= 24:
+                raise ValueError(part)
+            ranges.append((start, end))
+    except ValueError:
+        raise vol.Invalid('You should input hours as ranges from 0 to 24, e.g. "0-6,21-24".')
+    return ranges
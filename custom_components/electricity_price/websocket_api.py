@@ -0,0 +1,72 @@
+"""
+Websocket subscription to the prices, for consumers outside Home Assistant
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant import core
+from homeassistant.components import websocket_api
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+import homeassistant.helpers.config_validation as cv
+
+from .const import DATA_PRICE_STREAM, DOMAIN
+from .price_stream import PriceStream
+
+ATTR_EVENT = "event"
+
+
+@core.callback
+def _get_price_stream(hass: core.HomeAssistant, entry_id: str | None) -> PriceStream | None:
+    """Return the price stream of a config entry, or of the only config entry if none is given."""
+    domain_data = hass.data.get(DOMAIN, {})
+    if entry_id is not None:
+        return domain_data.get(entry_id, {}).get(DATA_PRICE_STREAM)
+    streams = [
+        domain_data[entry.entry_id][DATA_PRICE_STREAM]
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.entry_id in domain_data
+    ]
+    return streams[0] if len(streams) == 1 else None
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe",
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+@core.callback
+def websocket_subscribe(
+        hass: core.HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Subscribe to the prices of a config entry.
+
+    Sends all prices at once and when they change, and the current interval at
+    each interval boundary.
+    """
+    stream = _get_price_stream(hass, msg.get(ATTR_CONFIG_ENTRY_ID))
+    if stream is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            f"No electricity price entry {msg[ATTR_CONFIG_ENTRY_ID]}"
+            if ATTR_CONFIG_ENTRY_ID in msg
+            else f"{ATTR_CONFIG_ENTRY_ID} is required unless there is exactly one electricity price entry",
+        )
+        return
+
+    @core.callback
+    def send(event: str, message: dict[str, Any]) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], {ATTR_EVENT: event, **message}))
+
+    connection.send_result(msg["id"])
+    connection.subscriptions[msg["id"]] = stream.async_subscribe(send)
+
+
+@core.callback
+def async_setup_websocket_api(hass: core.HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
@@ -0,0 +1,209 @@
+"""Tests for the async Eloverblik client against a local fake server."""
+from datetime import date, datetime, timedelta, timezone
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from custom_components.electricity_price.api import (
+    EloverblikAuthError,
+    EloverblikClient,
+    EloverblikError,
+    MeterPeriod,
+)
+
+from .conftest import METERING_POINT, load_fixture
+
+REFRESH_TOKEN = "refresh-token"
+DATA_TOKEN = "data-token"
+
+
+def charges_response(metering_points: list[str]) -> dict:
+    """Return a getcharges response built from the recorded tariffs."""
+    charges = load_fixture("eloverblik_tariffs.json")["charges"]
+    return {
+        "result": [
+            {
+                "success": True,
+                "errorText": "NoError",
+                "result": {
+                    "meteringPointId": metering_point,
+                    "tariffs": [
+                        {"name": "Transmissions nettarif", "prices": [{"position": "1", "price": charges["transmissions_nettarif"]}]},
+                        {"name": "Systemtarif", "prices": [{"position": "1", "price": charges["systemtarif"]}]},
+                        {"name": "Elafgift", "prices": [{"position": "1", "price": charges["elafgift"]}]},
+                        {
+                            "name": "Nettarif C time",
+                            "prices": [
+                                {"position": str(i + 1), "price": price}
+                                for i, price in enumerate(charges["nettarif_c"])
+                            ],
+                        },
+                    ],
+                },
+            }
+            for metering_point in metering_points
+        ]
+    }
+
+
+def time_series_response(metering_point: str, first_day: date, days: int) -> dict:
+    """Return a gettimeseries response of hourly consumption of 0.5 kWh, with the first hour missing."""
+    return {
+        "result": [
+            {
+                "success": True,
+                "errorText": "NoError",
+                "id": metering_point,
+                "MyEnergyData_MarketDocument": {
+                    "TimeSeries": [
+                        {
+                            "Period": [
+                                {
+                                    "resolution": "PT1H",
+                                    "timeInterval": {
+                                        "start": f"{first_day + timedelta(days=i - 1)}T23:00:00Z",
+                                        "end": f"{first_day + timedelta(days=i)}T23:00:00Z",
+                                    },
+                                    "Point": [
+                                        {"position": str(hour + 1), "out_Quantity.quantity": "0.5", "out_Quantity.quality": "A04"}
+                                        for hour in range(1, 24)
+                                    ],
+                                }
+                                for i in range(days)
+                            ]
+                        }
+                    ]
+                },
+            }
+        ]
+    }
+
+
+class FakeEloverblik:
+    """Local Eloverblik customer API with scripted failures."""
+
+    def __init__(self):
+        self.token_requests = 0
+        self.charges_requests = 0
+        # Status codes (and headers) to respond with before answering normally.
+        self.charges_failures: list[tuple[int, dict]] = []
+        self.valid_data_tokens = {DATA_TOKEN}
+        app = web.Application()
+        app.router.add_get("/api/token", self.token)
+        app.router.add_post("/api/meteringpoints/meteringpoint/getcharges", self.getcharges)
+        app.router.add_post("/api/meterdata/gettimeseries/{first}/{end}/{aggregation}", self.gettimeseries)
+        self.server = TestServer(app)
+
+    @property
+    def api_url(self) -> str:
+        return str(self.server.make_url("/api"))
+
+    async def token(self, request: web.Request) -> web.Response:
+        self.token_requests += 1
+        if request.headers.get("Authorization") != f"Bearer {REFRESH_TOKEN}":
+            return web.Response(status=401)
+        return web.json_response({"result": DATA_TOKEN})
+
+    async def getcharges(self, request: web.Request) -> web.Response:
+        self.charges_requests += 1
+        if request.headers.get("Authorization") not in {f"Bearer {token}" for token in self.valid_data_tokens}:
+            return web.Response(status=401)
+        if self.charges_failures:
+            status, headers = self.charges_failures.pop(0)
+            return web.Response(status=status, headers=headers)
+        body = await request.json()
+        return web.json_response(charges_response(body["meteringPoints"]["meteringPoint"]))
+
+    async def gettimeseries(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        first_day = date.fromisoformat(request.match_info["first"])
+        days = (date.fromisoformat(request.match_info["end"]) - first_day).days
+        return web.json_response(time_series_response(body["meteringPoints"]["meteringPoint"][0], first_day, days))
+
+
+@pytest.fixture
+async def fake_eloverblik(socket_enabled):
+    # The fake server listens on a local port, which pytest-socket blocks by default.
+    fake = FakeEloverblik()
+    await fake.server.start_server()
+    yield fake
+    await fake.server.close()
+
+
+@pytest.fixture
+async def session():
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+def make_client(session, fake, refresh_token=REFRESH_TOKEN):
+    return EloverblikClient(session, refresh_token, api_url=fake.api_url, backoff_base=0.001)
+
+
+async def test_tariffs_parsed(session, fake_eloverblik):
+    charges = await make_client(session, fake_eloverblik).async_get_tariffs(METERING_POINT)
+
+    assert charges == load_fixture("eloverblik_tariffs.json")["charges"]
+
+
+async def test_tariffs_batched(session, fake_eloverblik):
+    metering_points = [METERING_POINT, "571313100000000001", "571313100000000002"]
+
+    tariffs = await make_client(session, fake_eloverblik).async_get_tariffs_batch(metering_points)
+
+    assert sorted(tariffs) == metering_points
+    assert fake_eloverblik.charges_requests == 1
+
+
+async def test_token_reused(session, fake_eloverblik):
+    client = make_client(session, fake_eloverblik)
+    await client.async_get_tariffs(METERING_POINT)
+    await client.async_get_tariffs(METERING_POINT)
+
+    assert fake_eloverblik.token_requests == 1
+    assert fake_eloverblik.charges_requests == 2
+
+
+async def test_retry_when_busy(session, fake_eloverblik):
+    fake_eloverblik.charges_failures = [(503, {}), (429, {"Retry-After": "0"})]
+
+    charges = await make_client(session, fake_eloverblik).async_get_tariffs(METERING_POINT)
+
+    assert charges
+    assert fake_eloverblik.charges_requests == 3
+
+
+async def test_expired_data_token_renewed(session, fake_eloverblik):
+    client = make_client(session, fake_eloverblik)
+    await client.async_get_tariffs(METERING_POINT)
+    fake_eloverblik.valid_data_tokens = set()
+
+    with pytest.raises(EloverblikError):
+        await client.async_get_tariffs(METERING_POINT)
+    # Each rejected request gets a new data access token.
+    assert fake_eloverblik.token_requests > 1
+
+
+async def test_gives_up_after_retries(session, fake_eloverblik):
+    fake_eloverblik.charges_failures = [(500, {})] * 10
+
+    with pytest.raises(EloverblikError):
+        await make_client(session, fake_eloverblik).async_get_tariffs(METERING_POINT)
+    assert fake_eloverblik.charges_requests == 5
+
+
+async def test_invalid_refresh_token(session, fake_eloverblik):
+    with pytest.raises(EloverblikAuthError):
+        await make_client(session, fake_eloverblik, "wrong").async_get_tariffs(METERING_POINT)
+    assert fake_eloverblik.token_requests == 1
+
+
+async def test_time_series_parsed(session, fake_eloverblik):
+    periods = await make_client(session, fake_eloverblik).async_get_time_series(
+        METERING_POINT, date(2025, 1, 14), date(2025, 1, 16)
+    )
+
+    assert len(periods) == 2
+    assert periods[0] == MeterPeriod(datetime(2025, 1, 13, 23, tzinfo=timezone.utc), 3600, [0.0] + [0.5] * 23)
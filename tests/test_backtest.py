@@ -0,0 +1,55 @@
+"""Tests for repricing recorded spot prices."""
+from datetime import date, timedelta
+
+import pytest
+import voluptuous as vol
+
+from custom_components.electricity_price.backtest import TariffVersion, aggregate, priced_days
+from custom_components.electricity_price.services import TARIFF_VERSION_SCHEMA
+
+from .conftest import TIME_ZONE, load_fixture
+
+
+@pytest.fixture
+def tariffs():
+    return load_fixture("eloverblik_tariffs.json")["charges"]
+
+
+def spot_days(first_day, count, price=1.0):
+    """Yield days of constant 15-minute spot prices."""
+    for i in range(count):
+        yield first_day + timedelta(days=i), [price] * 96
+
+
+def test_tariff_versions(tariffs):
+    cheaper = {**tariffs, "elafgift": 0.0}
+    versions = [TariffVersion(date(2025, 1, 3), cheaper), TariffVersion(date(2025, 1, 1), tariffs)]
+
+    days = dict(priced_days(spot_days(date(2024, 12, 31), 4), versions, TIME_ZONE))
+
+    # No tariffs in effect on the first day.
+    assert list(days) == [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)]
+    assert days[date(2025, 1, 2)][0] == pytest.approx(days[date(2025, 1, 3)][0] + 0.761 * 1.25, abs=0.002)
+
+
+def test_aggregate():
+    days = [(date(2025, 1, 31), [1.0] * 96), (date(2025, 2, 1), [3.0] * 92), (date(2025, 2, 2), [2.0] * 24)]
+
+    result = aggregate(iter(days))
+
+    assert result["days"] == 3
+    assert (result["min"], result["max"]) == (1.0, 3.0)
+    assert result["average"] == round((24 * 1.0 + 23 * 3.0 + 24 * 2.0) / 71, 3)
+    assert result["months"]["2025-02"] == {"days": 2, "average": round((23 * 3.0 + 24 * 2.0) / 47, 3), "min": 2.0, "max": 3.0}
+
+
+def test_tariff_versions_validated():
+    tariffs = {"valid_from": "2025-01-01", "elafgift": "0.72", "nettarif_c": ["0.13"] * 24}
+
+    validated = TARIFF_VERSION_SCHEMA(tariffs)
+
+    assert validated == {"valid_from": date(2025, 1, 1), "elafgift": 0.72, "nettarif_c": [0.13] * 24}
+    with pytest.raises(vol.Invalid):
+        TARIFF_VERSION_SCHEMA({**tariffs, "nettarif_c": [0.13] * 23})
+    with pytest.raises(vol.Invalid):
+        TARIFF_VERSION_SCHEMA({**tariffs, "nettarif_d": 0.1})
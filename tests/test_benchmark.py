@@ -0,0 +1,139 @@
+"""Benchmarks for the pricing pipeline.
+
+Run with ``pytest tests/test_benchmark.py --benchmark-autosave`` and compare
+against a saved run with ``--benchmark-compare --benchmark-compare-fail=mean:10%``.
+"""
+from datetime import date, timedelta
+import random
+import tracemalloc
+
+import pytest
+
+from custom_components.electricity_price.backtest import TariffVersion, aggregate, priced_days
+from custom_components.electricity_price.const import ATTR_TODAY, ATTR_TOMORROW
+from custom_components.electricity_price.coordinator import (
+    DATA_INTERVAL_INDEX,
+    ElectricityPriceCoordinator,
+)
+
+from .conftest import TIME_ZONE, StubEloverblik, load_fixture
+
+# Peak memory allocated by one update without cached prices.
+UPDATE_ALLOCATION_BUDGET = 512 * 1024
+# Peak memory allocated by a backtest, which should not grow with the number of days.
+BACKTEST_ALLOCATION_BUDGET = 512 * 1024
+
+
+@pytest.fixture
+def tariffs():
+    return load_fixture("eloverblik_tariffs.json")["charges"]
+
+
+def test_calculate_total_cold(benchmark, fake_hass, config, tariffs, loop):
+    """Price today and tomorrow without any cached days."""
+
+    def setup():
+        return (ElectricityPriceCoordinator(fake_hass, config),), {}
+
+    def calculate(coordinator):
+        return loop.run_until_complete(coordinator.calculate_total(tariffs))
+
+    result = benchmark.pedantic(calculate, setup=setup, rounds=200)
+    assert result[ATTR_TODAY]
+
+
+def test_calculate_total_cached(benchmark, fake_hass, config, tariffs, loop):
+    """Price unchanged days, which should only hit the cache."""
+    coordinator = ElectricityPriceCoordinator(fake_hass, config)
+    loop.run_until_complete(coordinator.calculate_total(tariffs))
+
+    result = benchmark(lambda: loop.run_until_complete(coordinator.calculate_total(tariffs)))
+    assert result[ATTR_TODAY]
+
+
+def test_time_stamps(benchmark, fake_hass, config, nordpool):
+    coordinator = ElectricityPriceCoordinator(fake_hass, config)
+    prices = nordpool["attributes"]["today"]
+    day = coordinator.calendar.today().day
+
+    result = benchmark(lambda: coordinator.calendar.day(day).time_stamps(prices))
+    assert len(result) == len(prices)
+
+
+def test_update_cold(benchmark, fake_hass, config, loop):
+    """Full update of a new coordinator, with tariffs in the shared tariff cache."""
+
+    def setup():
+        return (ElectricityPriceCoordinator(fake_hass, config),), {}
+
+    def update(coordinator):
+        return loop.run_until_complete(coordinator._async_update_data())
+
+    data = benchmark.pedantic(update, setup=setup, rounds=200)
+    assert len(data[DATA_INTERVAL_INDEX]) == len(data[ATTR_TODAY]) + len(data[ATTR_TOMORROW])
+
+
+def test_update_unchanged(benchmark, fake_hass, config, loop):
+    """Update triggered without any change to the prices or tariffs."""
+    coordinator = ElectricityPriceCoordinator(fake_hass, config)
+    coordinator.data = loop.run_until_complete(coordinator._async_update_data())
+
+    data = benchmark(lambda: loop.run_until_complete(coordinator._async_update_data()))
+    assert data is coordinator.data
+
+
+async def test_update_allocations(fake_hass, config):
+    """Guard the memory allocated by an update."""
+    coordinator = ElectricityPriceCoordinator(fake_hass, config)
+    # Warm up the tariff cache and the interval layouts.
+    await ElectricityPriceCoordinator(fake_hass, config)._async_update_data()
+
+    tracemalloc.start()
+    await coordinator._async_update_data()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert peak < UPDATE_ALLOCATION_BUDGET
+
+
+async def test_tariffs_fetched_once(fake_hass, config):
+    """Updates of several coordinators share one tariff fetch."""
+    for _ in range(5):
+        await ElectricityPriceCoordinator(fake_hass, config)._async_update_data()
+
+    assert StubEloverblik.calls == 1
+
+
+async def test_prices_match_intervals(fake_hass, config, nordpool):
+    """Every published interval is priced, including on 23 and 25 hour days."""
+    data = await ElectricityPriceCoordinator(fake_hass, config)._async_update_data()
+
+    assert len(data[ATTR_TODAY]) == len(nordpool["attributes"]["today"])
+    assert len(data[ATTR_TOMORROW]) == len(nordpool["attributes"]["tomorrow"])
+
+
+def spot_year():
+    """Yield a year of random 15-minute spot prices, one day at a time."""
+    rng = random.Random(1)
+    for i in range(365):
+        yield date(2024, 1, 1) + timedelta(days=i), [rng.uniform(-0.5, 3.0) for _ in range(96)]
+
+
+def test_backtest_year(benchmark, tariffs):
+    """Reprice a year of 15-minute spot prices."""
+    versions = [TariffVersion(date(2024, 1, 1), tariffs)]
+
+    result = benchmark(lambda: aggregate(priced_days(spot_year(), versions, TIME_ZONE)))
+    assert result["days"] == 365
+
+
+def test_backtest_allocations(tariffs):
+    """A backtest holds one day at a time."""
+    versions = [TariffVersion(date(2024, 1, 1), tariffs)]
+
+    tracemalloc.start()
+    aggregate(priced_days(spot_year(), versions, TIME_ZONE))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert peak < BACKTEST_ALLOCATION_BUDGET
@@ -0,0 +1,52 @@
+"""Tests for costing consumption at the calculated prices."""
+from datetime import date
+
+import pytest
+
+from custom_components.electricity_price.consumption_cost import (
+    DATA_DAYS,
+    DATA_MONTH_START,
+    DayCost,
+    last_day_cost,
+    month_to_date_cost,
+)
+from custom_components.electricity_price.pricing import align_consumption, consumption_costs
+
+QUARTER_PRICES = [1.0] * 68 + [3.0] * 16 + [1.0] * 12  # 17:00-21:00 at 3.0
+
+
+def test_quarter_hour_consumption():
+    consumption = [0.1] * 96
+
+    assert consumption_costs([(consumption, QUARTER_PRICES)]) == pytest.approx([0.1 * (80 + 3 * 16)])
+
+
+def test_hourly_consumption_at_hourly_average():
+    hourly = [1.0] * 24
+
+    assert consumption_costs([(hourly, QUARTER_PRICES)]) == pytest.approx([20 * 1.0 + 4 * 3.0])
+
+
+def test_days_costed_in_one_batch():
+    days = [([1.0] * 23, [2.0] * 92), ([0.25] * 100, [1.0] * 25), ([0.5] * 96, QUARTER_PRICES)]
+
+    assert consumption_costs(days) == pytest.approx([46.0, 25.0, 0.5 * (80 + 3 * 16)])
+
+
+def test_misaligned_consumption():
+    with pytest.raises(ValueError):
+        align_consumption([1.0] * 23, 96)
+
+
+def test_last_day_and_month_to_date():
+    data = {
+        DATA_DAYS: {
+            date(2025, 1, 30): DayCost(10.0, 20.0),
+            date(2025, 2, 1): DayCost(8.0, 12.5),
+            date(2025, 2, 2): DayCost(6.0, 9.25),
+        },
+        DATA_MONTH_START: date(2025, 2, 1),
+    }
+
+    assert last_day_cost(data) == (date(2025, 2, 2), DayCost(6.0, 9.25))
+    assert month_to_date_cost(data) == DayCost(14.0, 21.75)
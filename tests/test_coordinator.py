@@ -0,0 +1,79 @@
+"""Tests for the update pipeline of the coordinator."""
+from homeassistant.helpers.update_coordinator import UpdateFailed
+import pytest
+
+from custom_components.electricity_price.const import ATTR_CURRENCY
+from custom_components.electricity_price.coordinator import ElectricityPriceCoordinator
+from custom_components.electricity_price.instrumentation import COUNTER_SUPERSEDED_UPDATES
+
+
+async def test_superseded_update_keeps_data(fake_hass, config):
+    coordinator = ElectricityPriceCoordinator(fake_hass, config)
+    coordinator.data = await coordinator._async_update_data()
+    fetch_tariffs = coordinator.fetch_tariffs
+
+    async def fetch_while_triggered():
+        # The price sensor changes while the tariffs are fetched.
+        coordinator._update_generation += 1
+        return await fetch_tariffs()
+
+    coordinator.fetch_tariffs = fetch_while_triggered
+
+    assert await coordinator._async_update_data() is coordinator.data
+    assert coordinator.metrics.counters[COUNTER_SUPERSEDED_UPDATES] == 1
+
+
+async def test_first_update_never_superseded(fake_hass, config):
+    coordinator = ElectricityPriceCoordinator(fake_hass, config)
+    fetch_tariffs = coordinator.fetch_tariffs
+
+    async def fetch_while_triggered():
+        coordinator._update_generation += 1
+        return await fetch_tariffs()
+
+    coordinator.fetch_tariffs = fetch_while_triggered
+
+    assert await coordinator._async_update_data() is not None
+    assert coordinator.metrics.counters[COUNTER_SUPERSEDED_UPDATES] == 0
+
+
+async def test_prices_in_other_currency_rejected(fake_hass, config, nordpool):
+    # Adding the DKK tariffs to SEK spot prices would publish a mixed total as SEK.
+    fake_hass.states.set(nordpool["entity_id"], nordpool["state"], {**nordpool["attributes"], "currency": "SEK"})
+    coordinator = ElectricityPriceCoordinator(fake_hass, config)
+
+    with pytest.raises(UpdateFailed, match="SEK"):
+        await coordinator._async_update_data()
+
+
+async def test_eur_prices_priced_in_dkk(fake_hass, config, nordpool):
+    fake_hass.states.set(nordpool["entity_id"], nordpool["state"], {**nordpool["attributes"], "currency": "EUR"})
+
+    data = await ElectricityPriceCoordinator(fake_hass, config)._async_update_data()
+
+    assert data[ATTR_CURRENCY] == "DKK"
+
+
+async def test_previous_prices_kept_while_sensor_unavailable(fake_hass, config):
+    coordinator = ElectricityPriceCoordinator(fake_hass, config)
+    coordinator.data = await coordinator._async_update_data()
+
+    async def sensor_not_set_up(sensor_id):
+        return None
+
+    # E.g. restored prices while the Nordpool integration is still starting.
+    coordinator.wait_for_sensor = sensor_not_set_up
+
+    assert await coordinator._async_update_data() is coordinator.data
+
+
+async def test_update_fails_without_sensor_or_previous_prices(fake_hass, config):
+    coordinator = ElectricityPriceCoordinator(fake_hass, config)
+
+    async def sensor_not_set_up(sensor_id):
+        return None
+
+    coordinator.wait_for_sensor = sensor_not_set_up
+
+    with pytest.raises(UpdateFailed, match="not available"):
+        await coordinator._async_update_data()
@@ -0,0 +1,47 @@
+"""Tests for estimating spot prices not yet published."""
+from datetime import date, timedelta
+
+import pytest
+
+from custom_components.electricity_price.forecast import HourOfWeekModel
+
+from .conftest import TIME_ZONE
+
+
+def daily_profile(evening: float) -> list[float]:
+    """Return 15-minute prices of 1.0, with ``evening`` from 17 to 21."""
+    return [evening if 17 * 4 <= i < 21 * 4 else 1.0 for i in range(96)]
+
+
+def test_hour_of_week_profile():
+    model = HourOfWeekModel()
+    first = date(2025, 1, 6)  # Monday
+    for i in range(14):
+        model.fit_day(first + timedelta(days=i), daily_profile(3.0), TIME_ZONE)
+
+    prices = model.predict_day(first + timedelta(days=14), TIME_ZONE)
+
+    assert len(prices) == 96
+    # The evening peak is learned relative to the daily level.
+    assert prices[18 * 4] - prices[3 * 4] == pytest.approx(2.0, abs=0.01)
+    assert sum(prices) / len(prices) == pytest.approx(model.level, abs=0.01)
+
+
+def test_refit_only_newer_days():
+    model = HourOfWeekModel()
+    model.fit_day(date(2025, 1, 6), [1.0] * 96, TIME_ZONE)
+    model.fit_day(date(2025, 1, 6), [5.0] * 96, TIME_ZONE)
+    model.fit_day(date(2025, 1, 7), [3.0] * 24, TIME_ZONE)
+
+    assert model.fitted_through == date(2025, 1, 7)
+    assert model.level == pytest.approx(2.0)
+
+
+def test_stored_model():
+    model = HourOfWeekModel()
+    model.fit_day(date(2025, 3, 30), daily_profile(2.0)[:92], TIME_ZONE)
+
+    restored = HourOfWeekModel.from_dict(model.as_dict())
+
+    assert restored.fitted_through == model.fitted_through
+    assert restored.predict_day(date(2025, 4, 6), TIME_ZONE) == model.predict_day(date(2025, 4, 6), TIME_ZONE)
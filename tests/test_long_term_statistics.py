@@ -0,0 +1,37 @@
+"""Tests for the long-term statistics of the calculated prices."""
+from datetime import date, datetime, time
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.electricity_price.long_term_statistics import hourly_statistics, statistic_id
+
+from .conftest import TIME_ZONE
+
+
+@pytest.mark.parametrize(
+    ("day", "hours"),
+    [(date(2025, 1, 15), 24), (date(2025, 3, 30), 23), (date(2025, 10, 26), 25)],
+)
+def test_hourly_statistics(day, hours):
+    day_start = datetime.combine(day, time(), dt_util.get_time_zone(TIME_ZONE))
+    prices = [float(i) for i in range(hours * 4)]
+
+    statistics = hourly_statistics(day_start, prices)
+
+    assert len(statistics) == hours
+    assert statistics[0]["start"] == dt_util.as_utc(day_start)
+    assert (statistics[1]["min"], statistics[1]["max"], statistics[1]["mean"]) == (4.0, 7.0, 5.5)
+
+
+def test_hourly_prices_imported_as_is():
+    day_start = datetime.combine(date(2025, 1, 15), time(), dt_util.get_time_zone(TIME_ZONE))
+
+    statistics = hourly_statistics(day_start, [1.5] * 24)
+
+    assert [s["mean"] for s in statistics] == [1.5] * 24
+
+
+def test_statistic_id(config):
+    assert statistic_id(config) == "electricity_price:total_price_571313100000000000_nordpool_kwh_dk2_dkk_3_10_0"
@@ -0,0 +1,53 @@
+"""Tests for finding cheap windows in the calculated prices."""
+from datetime import datetime, timezone
+from itertools import combinations
+
+import pytest
+
+from custom_components.electricity_price.interval_index import IntervalIndex
+from custom_components.electricity_price.planning import (
+    cheapest_slots,
+    cheapest_window,
+    slot_range,
+)
+
+PRICES = [3.1, 2.8, 2.2, 1.9, 2.0, 2.5, 1.7, 1.8, 4.0, 3.3, 1.7, 2.9]
+
+
+@pytest.mark.parametrize("slots", range(1, len(PRICES) + 1))
+def test_cheapest_window_matches_brute_force(slots):
+    window = cheapest_window(PRICES, slots)
+
+    totals = [sum(PRICES[i:i + slots]) for i in range(len(PRICES) - slots + 1)]
+    assert window.start == totals.index(min(totals))
+    assert window.total == pytest.approx(min(totals))
+
+
+def test_cheapest_window_within_range():
+    window = cheapest_window(PRICES, 2, first=7, last=11)
+
+    assert (window.start, window.slots) == (9, 2)
+
+
+def test_cheapest_window_too_short():
+    assert cheapest_window(PRICES, 4, first=10) is None
+
+
+@pytest.mark.parametrize("slots", [1, 3, 5])
+def test_cheapest_slots_matches_brute_force(slots):
+    indices = cheapest_slots(PRICES, slots, first=1)
+
+    best = min(combinations(range(1, len(PRICES)), slots), key=lambda c: sum(PRICES[i] for i in c))
+    assert indices == sorted(indices)
+    assert sum(PRICES[i] for i in indices) == pytest.approx(sum(PRICES[i] for i in best))
+
+
+def test_slot_range():
+    day_start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    index = IntervalIndex.from_days([(day_start, PRICES)])
+    start = day_start.timestamp()
+
+    # From 00:10 until 02:20, intervals 00:15 up to 02:00-02:15.
+    assert slot_range(index, start + 600, start + 8400) == (1, 9)
+    assert slot_range(index, start + 600) == (1, len(PRICES))
+    assert slot_range(index, start + 8400, start + 600) == (10, 10)
@@ -0,0 +1,119 @@
+"""Tests for the configurable price formula."""
+from datetime import date
+import random
+
+import pytest
+import voluptuous as vol
+
+from custom_components.electricity_price.const import (
+    CONF_CHARGE,
+    CONF_HIGH_LOAD_TIMES,
+    CONF_LOW_LOAD_TIMES,
+    CONF_PEAK_LOAD_TIMES,
+    CONF_TAX,
+    CONF_TRANSPORT_HIGH,
+    CONF_TRANSPORT_LOW,
+    CONF_TRANSPORT_PEAK,
+)
+from custom_components.electricity_price.price_formula import PriceFormula
+from custom_components.electricity_price.pricing import BACKEND_NUMPY, align_variable_fees, fused_prices
+from custom_components.electricity_price.validation_helpers import hour_ranges_validation
+
+from .conftest import TIME_ZONE, load_fixture
+
+DAY = date(2025, 1, 15)
+
+
+@pytest.fixture
+def charges():
+    return load_fixture("eloverblik_tariffs.json")["charges"]
+
+
+def baseline_price(spot: float, charges: dict, nettarif_c: float) -> float:
+    """Return the total price as always published, adding the fees one at a time."""
+    tn, st, ea = charges["transmissions_nettarif"], charges["systemtarif"], charges["elafgift"]
+    return round(round(spot + tn + st + ea + nettarif_c, 3) * 1.25, 3)
+
+
+def price_all(compiled, spot: list[float], nettarif_c: float) -> list[float]:
+    """Price spot prices in days of 96 intervals under a constant network tariff."""
+    return [
+        price
+        for start in range(0, len(spot), 96)
+        for price in fused_prices(spot[start:start + 96], compiled.fixed_fees, [nettarif_c] * 96, compiled.multiplier)
+    ]
+
+
+def test_default_formula_matches_published_prices(charges):
+    """Without options, prices are the spot price plus the Eloverblik charges and 25 % VAT,
+    rounded exactly as before for every spot price at øre precision."""
+    # Every 4-decimal spot price from -0.5 to 3.0, where summing the fees first rounds differently.
+    spot = [i / 10000 for i in range(-5000, 30001)]
+    compiled = PriceFormula().compile(charges)
+
+    for nettarif_c in sorted(set(charges["nettarif_c"])):
+        expected = [baseline_price(p, charges, nettarif_c) for p in spot]
+        assert price_all(compiled, spot, nettarif_c) == expected
+    assert price_all(compiled, [-0.4996], 0.1101) == [0.621]
+
+
+def test_default_formula_follows_network_tariff(charges):
+    rng = random.Random(1)
+    spot = [round(rng.uniform(-0.5, 3.0), 4) for _ in range(96)]
+    compiled = PriceFormula().compile(charges)
+
+    prices = fused_prices(spot, compiled.fixed_fees, compiled.variable_fees(DAY, TIME_ZONE, 96), compiled.multiplier)
+
+    nettarif_c = align_variable_fees(charges["nettarif_c"], 96)
+    assert prices == [baseline_price(p, charges, fee) for p, fee in zip(spot, nettarif_c)]
+
+
+@pytest.mark.parametrize("formula", [PriceFormula(), PriceFormula(markup=0.0123, vat=12.5)])
+def test_numpy_backend_matches_python(charges, formula):
+    """NumPy rounds by scaling, so values close to a tie must still round as Python's round does."""
+    pytest.importorskip("numpy")
+    spot = [i / 10000 for i in range(-5000, 30001)]
+    compiled = formula.compile(charges)
+
+    for nettarif_c in sorted(set(charges["nettarif_c"])):
+        variable = [nettarif_c] * len(spot)
+        expected = fused_prices(spot, compiled.fixed_fees, variable, compiled.multiplier)
+        prices = fused_prices(spot, compiled.fixed_fees, variable, compiled.multiplier, BACKEND_NUMPY)
+        assert prices == expected
+
+
+def test_markup_and_vat():
+    compiled = PriceFormula(markup=0.1, vat=0.0).compile({})
+    prices = fused_prices([1.0, 2.0], compiled.fixed_fees, compiled.variable_fees(DAY, TIME_ZONE, 96), compiled.multiplier)
+
+    assert prices == [1.1, 2.1]
+
+
+def test_transport_fees_replace_network_tariff():
+    formula = PriceFormula.from_config(
+        {
+            CONF_TAX: 25.0,
+            CONF_CHARGE: 0.0,
+            CONF_TRANSPORT_LOW: 0.1,
+            CONF_LOW_LOAD_TIMES: "0-6",
+            CONF_TRANSPORT_HIGH: 0.3,
+            CONF_HIGH_LOAD_TIMES: "6-24",
+            CONF_TRANSPORT_PEAK: 0.8,
+            CONF_PEAK_LOAD_TIMES: "17-21",
+        }
+    )
+    additive = formula.compile({}).variable_fees(DAY, TIME_ZONE, 96)
+
+    assert [additive[hour * 4] for hour in (0, 6, 17, 21)] == [0.1, 0.3, 0.8, 0.3]
+
+
+def test_additive_vector_compiled_once(charges):
+    compiled = PriceFormula().compile(charges)
+
+    assert compiled.variable_fees(DAY, TIME_ZONE, 96) is compiled.variable_fees(date(2025, 1, 16), TIME_ZONE, 96)
+
+
+@pytest.mark.parametrize("value", ["6-0", "0-25", "morning", "1-2-3"])
+def test_invalid_hour_ranges(value):
+    with pytest.raises(vol.Invalid):
+        hour_ranges_validation(value)
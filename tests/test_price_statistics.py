@@ -0,0 +1,31 @@
+"""Tests for the per day price statistics."""
+import statistics
+
+import pytest
+
+from custom_components.electricity_price.price_statistics import PERCENTILES, day_statistics
+
+PRICES = [2.5, 1.9, 3.4, 1.9, 4.2, 0.8, 2.5, 3.0]
+
+
+def test_day_statistics():
+    result = day_statistics(PRICES)
+
+    assert (result.min, result.max) == (0.8, 4.2)
+    assert result.mean == round(statistics.mean(PRICES), 3)
+    # Linear interpolation, as statistics.quantiles with the inclusive method.
+    quartiles = statistics.quantiles(PRICES, n=4, method="inclusive")
+    assert [result.percentiles[p] for p in (25, 50, 75)] == [round(q, 3) for q in quartiles]
+    assert list(result.percentiles) == list(PERCENTILES)
+
+
+def test_ranks_share_ties():
+    result = day_statistics(PRICES)
+
+    assert result.ranks == [3, 1, 6, 1, 7, 0, 3, 5]
+    assert result.fraction(5) == 0
+    assert result.fraction(4) == pytest.approx(7 / 8)
+
+
+def test_no_prices():
+    assert day_statistics([]) is None
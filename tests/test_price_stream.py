@@ -0,0 +1,31 @@
+"""Tests for the messages pushed to price subscribers."""
+import pytest
+
+from custom_components.electricity_price.const import ATTR_TODAY, ATTR_TOMORROW
+from custom_components.electricity_price.coordinator import DATA_INTERVAL_INDEX, ElectricityPriceCoordinator
+from custom_components.electricity_price.price_stream import current_message, prices_message
+
+
+@pytest.fixture
+async def data(fake_hass, config):
+    return await ElectricityPriceCoordinator(fake_hass, config)._async_update_data()
+
+
+def test_prices_message(data):
+    message = prices_message(data, 3)
+
+    assert message["version"] == 3
+    assert message["prices"] == data[ATTR_TODAY] + data[ATTR_TOMORROW]
+    assert message["interval"] == 15
+
+
+def test_current_message_indexes_prices(data):
+    index = data[DATA_INTERVAL_INDEX]
+    prices = prices_message(data, 3)["prices"]
+
+    current = current_message(data, 3, index.starts[5] + 60)
+
+    assert current["version"] == 3
+    assert current["index"] == 5
+    assert current["current_price"] == prices[5]
+    assert current_message(data, 3, index.starts[0] - 1) is None
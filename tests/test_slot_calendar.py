@@ -0,0 +1,38 @@
+"""Tests for the calendar of local price intervals."""
+from datetime import date, datetime, timezone
+
+import pytest
+
+from custom_components.electricity_price.slot_calendar import get_slot_calendar
+
+from .conftest import TIME_ZONE
+
+
+@pytest.mark.parametrize(
+    ("day", "intervals"),
+    [(date(2025, 1, 15), 96), (date(2025, 3, 30), 92), (date(2025, 10, 26), 100)],
+)
+def test_intervals_per_day(day, intervals):
+    slots = get_slot_calendar(TIME_ZONE).day(day)
+
+    assert len(slots) == intervals
+    assert slots.labels[0].startswith(f"{day.isoformat()}T00:00:00")
+
+
+def test_time_stamps_across_dst():
+    stamps = get_slot_calendar(TIME_ZONE).day(date(2025, 3, 30)).time_stamps([1.0] * 92)
+
+    # 02:00-03:00 does not exist; the offset changes at 03:00.
+    assert stamps[7] == {"start": "2025-03-30T01:45:00+01:00", "end": "2025-03-30T03:00:00+02:00", "value": 1.0}
+    assert stamps[-1]["end"] == "2025-03-31T00:00:00+02:00"
+
+
+def test_today_rolls_over_at_midnight():
+    calendar = get_slot_calendar(TIME_ZONE)
+    last_interval = datetime(2025, 1, 15, 22, 59, 59, tzinfo=timezone.utc).timestamp()
+
+    today = calendar.today(last_interval)
+
+    assert today.day == date(2025, 1, 15)
+    assert today.index_at(last_interval) == 95
+    assert calendar.today(last_interval + 1).day == date(2025, 1, 16)
@@ -0,0 +1,46 @@
+"""Tests for the shared spot price ingestion."""
+from types import SimpleNamespace
+
+from custom_components.electricity_price.spot_prices import SpotSeries, get_spot_source
+
+from .conftest import PRICE_SENSOR, FakeHass
+
+
+def test_nordpool_attributes():
+    series = SpotSeries.from_attributes(
+        {
+            "region": "DK1",
+            "currency": "DKK",
+            "country": "Denmark",
+            "unit": "kWh",
+            "today": [{"start": "2025-01-15T00:00:00+01:00", "value": 0.5}, {"start": "2025-01-15T00:15:00+01:00", "value": 0.25}],
+            "tomorrow": [],
+        }
+    )
+
+    assert series == SpotSeries("DK1", "DKK", "Denmark", (0.5, 0.25), ())
+
+
+def test_prices_normalized_to_kwh():
+    in_cents = SpotSeries.from_attributes({"unit": "kWh", "price_in_cents": True, "today": [50.0], "tomorrow": [25.0]})
+    per_mwh = SpotSeries.from_attributes({"unit": "MWh", "today": [500.0], "tomorrow": []})
+
+    assert (in_cents.today, in_cents.tomorrow) == ((0.5,), (0.25,))
+    assert per_mwh.today == (0.5,)
+
+
+def test_eur_prices_converted_to_tariff_currency():
+    series = SpotSeries.from_attributes({"currency": "EUR", "unit": "MWh", "today": [100.0], "tomorrow": []})
+
+    assert series.currency == "DKK"
+    assert series.today == (0.746038,)
+
+
+def test_state_normalized_once():
+    hass = FakeHass()
+    state = SimpleNamespace(attributes={"currency": "DKK", "today": [0.5], "tomorrow": []})
+
+    source = get_spot_source(hass, PRICE_SENSOR)
+
+    assert get_spot_source(hass, PRICE_SENSOR) is source
+    assert source.series(state) is source.series(state)
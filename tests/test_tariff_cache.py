@@ -0,0 +1,44 @@
+"""Tests for batching tariff fetches across metering points."""
+import pytest
+
+from custom_components.electricity_price import tariff_cache
+from custom_components.electricity_price.instrumentation import COUNTER_API_CALLS, COUNTER_TARIFF_CACHE_HITS
+from custom_components.electricity_price.tariff_cache import TariffCache
+
+from .conftest import METERING_POINT, FakeHass, FakeStore, StubEloverblik, load_fixture
+
+METERING_POINTS = [METERING_POINT, "571313100000000001", "571313100000000002"]
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(tariff_cache, "Store", FakeStore)
+    monkeypatch.setattr(tariff_cache, "get_client", lambda hass, token: StubEloverblik(token))
+    StubEloverblik.calls = 0
+    return TariffCache(FakeHass())
+
+
+async def test_registered_metering_points_fetched_together(cache):
+    for metering_point in METERING_POINTS:
+        cache.async_register("token", metering_point)
+
+    tariffs = [await cache.async_get("token", metering_point) for metering_point in METERING_POINTS]
+
+    assert tariffs == [load_fixture("eloverblik_tariffs.json")["charges"]] * len(METERING_POINTS)
+    assert StubEloverblik.calls == 1
+    assert cache.metrics.counters[COUNTER_API_CALLS] == 1
+    assert cache.metrics.counters[COUNTER_TARIFF_CACHE_HITS] == len(METERING_POINTS) - 1
+
+
+async def test_batches_per_token(cache):
+    cache.async_register("token", METERING_POINTS[0])
+    cache.async_register("other token", METERING_POINTS[1])
+    unregister = cache.async_register("token", METERING_POINTS[2])
+    unregister()
+
+    await cache.async_get("token", METERING_POINTS[0])
+    await cache.async_get("other token", METERING_POINTS[1])
+    await cache.async_get("token", METERING_POINTS[2])
+
+    # Neither the other token's nor the unregistered metering point were in the first fetch.
+    assert StubEloverblik.calls == 3